@@ -0,0 +1,111 @@
+import random
+import time
+import tracemalloc
+
+from CA_factorsGenerator import build_coverage_array
+from CA_interactions import find_missing_interactions
+from CA_paramsGenerator import generate_mixed_covering_array
+
+
+GENERATORS = {
+    "factors (greedy)": lambda params_values, strength: build_coverage_array(
+        [list(range(size)) for size in params_values], strength=strength
+    ),
+    "params (compact)": lambda params_values, strength: generate_mixed_covering_array(
+        params_values, strength=strength
+    ),
+}
+
+CATALOGUE = {
+    "3^4": [3] * 4,
+    "2^100": [2] * 100,
+    "4^15 3^17 2^29": [4] * 15 + [3] * 17 + [2] * 29,
+    "printer": [3, 2, 5, 4, 3, 5],
+}
+
+CATALOGUE_GENERATORS = dict(GENERATORS, **{
+    "params (legacy)": lambda params_values, strength: generate_mixed_covering_array(params_values, "legacy"),
+})
+
+
+def benchmark_strength(params_values, strengths=(2, 3, 4), seed=0):
+    """
+    Measure how CAN and runtime of every generator grow with strength t.
+    :return: A list of (generator name, strength, CAN, seconds) tuples.
+    """
+    results = []
+    for name, generate in GENERATORS.items():
+        for strength in strengths:
+            random.seed(seed)
+            start = time.perf_counter()
+            covering_array = generate(params_values, strength)
+            results.append((name, strength, len(covering_array), time.perf_counter() - start))
+    return results
+
+
+def benchmark_catalogue(catalogue=CATALOGUE, strength=2, seed=0):
+    """
+    Run every generator on every configuration of the catalogue and check the result with find_missing_interactions.
+    Every run is done twice with the same seed: once for the runtime, once under tracemalloc for the peak memory
+    (tracing slows the generators down).
+    :return: A list of (configuration, generator name, CAN, seconds, peak memory in KiB, covered) tuples.
+    """
+    results = []
+    for config, params_values in catalogue.items():
+        for name, generate in CATALOGUE_GENERATORS.items():
+            random.seed(seed)
+            start = time.perf_counter()
+            covering_array = generate(params_values, strength)
+            seconds = time.perf_counter() - start
+
+            random.seed(seed)
+            tracemalloc.start()
+            generate(params_values, strength)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            covered = not find_missing_interactions(covering_array, params_values, strength)
+            results.append((config, name, len(covering_array), seconds, peak / 1024, covered))
+    return results
+
+
+def benchmark_verifier(params_values, num_rows=100000, strength=2, seed=0):
+    """
+    Time find_missing_interactions on random rows.
+    :return: The number of missing interactions and the time in seconds.
+    """
+    rng = random.Random(seed)
+    rows = [[rng.randrange(size) for size in params_values] for _ in range(num_rows)]
+    start = time.perf_counter()
+    missing = find_missing_interactions(rows, params_values, strength)
+    return len(missing), time.perf_counter() - start
+
+
+def print_catalogue_benchmark(catalogue=CATALOGUE, strength=2):
+    print(f"\t{'configuration':<15} | {'generator':<18} | {'CAN':>6} | {'time, s':>8} | {'peak, KiB':>10} | covered")
+    for config, name, can, seconds, peak, covered in benchmark_catalogue(catalogue, strength):
+        print(f"\t{config:<15} | {name:<18} | {can:>6} | {seconds:>8.3f} | {peak:>10.1f} | {covered}")
+    print()
+
+
+def print_verifier_benchmark(params_values, num_rows=100000, strength=2):
+    missing, seconds = benchmark_verifier(params_values, num_rows, strength)
+    print(f"Verifier: {num_rows} rows, {len(params_values)} parameters, t = {strength}: "
+          f"{missing} missing interactions in {seconds:.3f} s")
+    print()
+
+
+def print_strength_benchmark(params_values, strengths=(2, 3, 4)):
+    print(f"Parameters: {params_values}")
+    print(f"\t{'generator':<18} | {'t':>2} | {'CAN':>6} | {'time, s':>8}")
+    for name, strength, can, seconds in benchmark_strength(params_values, strengths):
+        print(f"\t{name:<18} | {strength:>2} | {can:>6} | {seconds:>8.3f}")
+    print()
+
+
+if __name__ == "__main__":
+    print_catalogue_benchmark()
+    print_verifier_benchmark(CATALOGUE["4^15 3^17 2^29"])
+    print_strength_benchmark([3] * 10)
+    print_strength_benchmark([4, 4, 3, 3, 3, 2, 2, 2, 2, 2, 2, 2])
+    print_strength_benchmark([2] * 30)
@@ -0,0 +1,151 @@
+import ast
+import csv
+import json
+import sys
+from array import array
+
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_ROWS_WIDTH = 20
+
+
+def write_csv(rows, path, header=None):
+    """
+    Write rows to a CSV file as they are produced. Writes are left to the buffering of the file object,
+    so rows reach the disk in blocks while they are still being generated, and all of them once the file is closed.
+    :return: The number of written rows.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        if header is not None:
+            writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_json_lines(records, path):
+    """
+    Write records to a JSON Lines file as they are produced, one JSON value per line, buffered as in write_csv.
+    :return: The number of written records.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def write_jsonl(rows, path, header=None):
+    """
+    Write rows to a JSON Lines file as they are produced, one JSON list per row
+    (or one object per row with the header names as keys), see write_json_lines.
+    :return: The number of written rows.
+    """
+    return write_json_lines((list(row) if header is None else dict(zip(header, row)) for row in rows), path)
+
+
+def npy_typecode(factors):
+    """
+    The smallest integer type (array typecode and NumPy descr) that holds value indexes of all factors.
+    """
+    largest = max((factor if isinstance(factor, int) else len(factor) for factor in factors), default=1)
+    endian = "<" if sys.byteorder == "little" else ">"
+    if largest <= 1 << 7:
+        return "b", "|i1"
+    if largest <= 1 << 15:
+        return "h", endian + "i2"
+    return "i", endian + "i4"
+
+
+def npy_header(descr, num_rows, num_columns):
+    """
+    NPY 1.0 header; the number of rows is padded to a fixed width, so the header can be rewritten in place.
+    """
+    shape = f"({num_rows:>{NPY_ROWS_WIDTH}}, {num_columns})"
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {shape}, }}"
+    padding = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += " " * padding + "\n"
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+def write_npy(rows, path, factors):
+    """
+    Write rows of a covering array to a NumPy .npy file of value indexes (int8 when every factor has
+    at most 128 values, int16 or int32 otherwise) as they are produced, and the factors to path + '.json'.
+    The header says 0 rows until the rows are over and the real number is written into it, so the file is
+    complete only once it is closed: np.load of a file still being written gives an array of shape (0, k).
+    Readers of an unfinished file must count the rows from the file size; consumers that read the rows
+    while they are generated should use write_csv or write_jsonl.
+    :param factors: A list where each element is either the number of values of a parameter (rows hold
+    value indexes) or the list of named values of a factor (rows hold the values).
+    :return: The number of written rows.
+    """
+    typecode, descr = npy_typecode(factors)
+    encoders = [None if isinstance(factor, int) else {value: i for i, value in enumerate(factor)} for factor in factors]
+
+    with open(path + ".json", "w", encoding="utf-8") as file:
+        json.dump({"factors": factors}, file, ensure_ascii=False)
+
+    count = 0
+    with open(path, "wb") as file:
+        file.write(npy_header(descr, 0, len(factors)))
+        for row in rows:
+            indexes = [value if encoder is None else encoder[value] for encoder, value in zip(encoders, row)]
+            file.write(array(typecode, indexes).tobytes())
+            count += 1
+        file.seek(0)
+        file.write(npy_header(descr, count, len(factors)))
+    return count
+
+
+def read_npy(path):
+    """
+    Read a covering array written by write_npy.
+    :return: The rows of value indexes and the factors.
+    """
+    with open(path + ".json", encoding="utf-8") as file:
+        factors = json.load(file)["factors"]
+
+    with open(path, "rb") as file:
+        if file.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"{path} is not an NPY 1.0 file")
+        header = ast.literal_eval(file.read(int.from_bytes(file.read(2), "little")).decode("latin1"))
+        typecode = {"i1": "b", "i2": "h", "i4": "i"}[header["descr"][1:]]
+        data = array(typecode)
+        data.frombytes(file.read())
+
+    if header["descr"][0] not in ("|", "<" if sys.byteorder == "little" else ">"):
+        data.byteswap()
+    num_rows, num_columns = header["shape"]
+    return [data[i * num_columns:(i + 1) * num_columns].tolist() for i in range(num_rows)], factors
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from CA_factorsGenerator import iter_coverage_array
+
+    factors = [
+        ['1 страница', '2 страницы', '7 страниц'],
+        ['Нет цветных рисунков', 'Есть цветные рисунки'],
+        ['A4', 'A5', 'B5', 'Letter', 'Envelop'],
+        ['HP', 'Epson', 'Canon', 'Xerox'],
+        ['Internet Explorer', 'Mozilla Firefox', 'Opera'],
+        ['Windows Me', 'Windows 2000', 'Windows XP', 'Linux SUSE 10.0', 'Linux RHEL 4.0']
+    ]
+    header = ['Pages', 'Pictures', 'Paper', 'Printer', 'Browser', 'OS']
+
+    directory = tempfile.mkdtemp()
+    for name, write, args in [
+        ("tests.csv", write_csv, (header,)),
+        ("tests.jsonl", write_jsonl, (header,)),
+        ("tests.npy", write_npy, (factors,)),
+    ]:
+        path = os.path.join(directory, name)
+        count = write(iter_coverage_array(factors), path, *args)
+        print(f"{path}: {count} tests, {os.path.getsize(path)} bytes")
@@ -1,33 +1,49 @@
 import itertools
+import math
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
+from CA_interactions import Constraints, InteractionIndex
 
-def generate_pairs(factors):
+
+def generate_pairs(factors, strength=2):
     """
     Generate all possible pairs of results for each combination of two factors.
+    With strength t, generate all t-tuples of results for each combination of t factors.
     """
     pairs = []
-    num_factors = len(factors)
-    for i in range(num_factors):
-        for j in range(i + 1, num_factors):
-            for value_i in factors[i]:
-                for value_j in factors[j]:
-                    pairs.append(((i, value_i), (j, value_j)))
+    for indexes in itertools.combinations(range(len(factors)), strength):
+        for values in itertools.product(*(factors[i] for i in indexes)):
+            pairs.append(tuple(zip(indexes, values)))
     return pairs
 
 
-def find_best_test(factors, uncovered_pairs):
+def interaction_row(factors, interaction):
+    """
+    Partial row of value indexes holding the values of an interaction (None for other factors).
+    """
+    row = [None] * len(factors)
+    for i, value in interaction:
+        row[i] = factors[i].index(value)
+    return row
+
+
+def find_best_test(factors, uncovered_pairs, strength=2, constraints=None):
     """
-    Find a test that covers the maximum number of uncovered pairs.
+    Find a test that covers the maximum number of uncovered pairs (or t-tuples).
+    Tests forbidden by the constraints are skipped.
     """
     best_test = None
     best_coverage = 0
     covered_by_test = set()
 
-    for potential_test in itertools.product(*factors):
-        current_coverage = set()
-        for (i, value_i), (j, value_j) in uncovered_pairs:
-            if potential_test[i] == value_i and potential_test[j] == value_j:
-                current_coverage.add(((i, value_i), (j, value_j)))
+    value_indexes = itertools.product(*(range(len(factor)) for factor in factors))
+    for potential_test, indexes in zip(itertools.product(*factors), value_indexes):
+        if constraints is not None and not constraints.is_valid(indexes):
+            continue
+
+        current_coverage = uncovered_pairs.intersection(itertools.combinations(enumerate(potential_test), strength))
 
         if len(current_coverage) > best_coverage:
             best_test = potential_test
@@ -37,27 +53,266 @@ def find_best_test(factors, uncovered_pairs):
     return best_test, covered_by_test
 
 
-def build_coverage_array(factors):
+def iter_exact_coverage_array(factors, strength=2, constraints=None):
     """
-    Construction of a minimal set of tests to cover all pairs.
+    Construction of a set of tests by exhaustive search over all possible tests on every step,
+    yielding every test as soon as it is chosen.
+    Suitable only for small inputs: each step walks the whole product of factors.
     """
-    uncovered_pairs = set(generate_pairs(factors))
-    test_set = []
+    uncovered_pairs = set(generate_pairs(factors, strength))
+    if constraints is not None:
+        uncovered_pairs = {pair for pair in uncovered_pairs if constraints.is_valid(interaction_row(factors, pair))}
 
     while uncovered_pairs:
-        best_test, covered_by_test = find_best_test(factors, uncovered_pairs)
-        test_set.append(best_test)
+        best_test, covered_by_test = find_best_test(factors, uncovered_pairs, strength, constraints)
+        if best_test is None:
+            break  # the rest cannot appear in any valid test
         uncovered_pairs -= covered_by_test
+        yield best_test
+
+
+_shared_coverage = None
+_shared_constraints = None
+
+
+def _attach_shared_coverage(shared, sizes, strength, constraints):
+    """
+    Worker initializer: use the shared uncovered map of the parent process without copying it.
+    """
+    global _shared_coverage, _shared_constraints
+    _shared_coverage = InteractionIndex(sizes, strength)
+    _shared_coverage.uncovered = memoryview(shared).cast("B")
+    _shared_constraints = constraints
+
+
+def _score_prefix(prefix):
+    """
+    Find the first test with the maximum number of uncovered interactions among the tests
+    starting with prefix (value indexes of the leading factors).
+    """
+    best_test = None
+    best_coverage = 0
+    rest = (range(size) for size in _shared_coverage.sizes[len(prefix):])
+
+    for suffix in itertools.product(*rest):
+        potential_test = prefix + suffix
+        if _shared_constraints is not None and not _shared_constraints.is_valid(potential_test):
+            continue
+        coverage = _shared_coverage.count_row(potential_test)
+        if coverage > best_coverage:
+            best_test = potential_test
+            best_coverage = coverage
 
-    return test_set
+    return best_coverage, best_test
+
+
+def find_best_test_parallel(executor, prefixes):
+    """
+    Find a test that covers the maximum number of uncovered interactions, scoring the tests of
+    every prefix in a separate task. Results are merged in the order of prefixes, so ties are
+    broken exactly as in the sequential search and the result does not depend on the number of workers.
+    """
+    best_test = None
+    best_coverage = 0
+
+    for coverage, potential_test in executor.map(_score_prefix, prefixes):
+        if coverage > best_coverage:
+            best_test = potential_test
+            best_coverage = coverage
+
+    return best_test
+
+
+def iter_parallel_exact_coverage_array(factors, strength=2, workers=2, constraints=None):
+    """
+    Construction of a set of tests by exhaustive search split across a process pool, yielding every
+    test as soon as it is chosen.
+    The product of factors is split by values of the leading factors, the uncovered map lives in
+    shared memory and is updated in place after every test, so tasks carry only their prefix.
+    """
+    sizes = [len(factor) for factor in factors]
+    coverage = InteractionIndex(sizes, strength)
+    if constraints is not None:
+        coverage.exclude(constraints)
+    shared = multiprocessing.RawArray("B", coverage.total)
+    shared_view = memoryview(shared).cast("B")
+    shared_view[:] = coverage.uncovered
+    coverage.uncovered = shared_view
+
+    num_leading = 0
+    while num_leading < len(sizes) and math.prod(sizes[:num_leading]) < 4 * workers:
+        num_leading += 1
+    prefixes = list(itertools.product(*(range(size) for size in sizes[:num_leading])))
+
+    with ProcessPoolExecutor(workers, initializer=_attach_shared_coverage,
+                             initargs=(shared, sizes, strength, constraints)) as executor:
+        while coverage.remaining:
+            best_test = find_best_test_parallel(executor, prefixes)
+            if best_test is None:
+                break  # the rest cannot appear in any valid test
+            coverage.cover_row(best_test)
+            yield tuple(factor[value] for factor, value in zip(factors, best_test))
+
+
+def complete_greedy_row(coverage, row, rest, constraints=None):
+    """
+    Assign values to the factors in rest one at a time: every factor takes the value covering the most
+    uncovered interactions with already fixed factors, ties are broken by the per-(factor, value)
+    counters and then by the lowest index. With constraints, values forbidden with already fixed factors
+    are pruned and dead ends are backtracked. Returns False if the row has no valid completion.
+    """
+    if constraints is None:
+        fixed = [i for i, value in enumerate(row) if value is not None]
+        for factor in rest:
+            gains = coverage.gains(row, fixed, factor)
+            row[factor] = max(range(coverage.sizes[factor]), key=lambda v: (gains[v], coverage.counts[factor][v]))
+            fixed.append(factor)
+        return True
 
+    def candidates(row, factor):
+        gains = coverage.gains(row, [i for i, value in enumerate(row) if value is not None], factor)
+        return sorted(range(coverage.sizes[factor]), key=lambda v: (-gains[v], -coverage.counts[factor][v]))
 
-def print_coverage_array(factors):
-    covering_arrays = build_coverage_array(factors)
+    return constraints.complete(row, rest, candidates)
+
+
+def build_greedy_row(coverage, constraints=None):
+    """
+    Build a test one factor at a time (AETG/IPOG style).
+    The row starts from the factor value with the most uncovered interactions, the other factors
+    are filled by complete_greedy_row in order of their largest counters, so the result is
+    deterministic. For strength above 2 the row starts from a whole uncovered interaction of that
+    value, otherwise the first factors would be chosen blindly and could cover nothing new.
+    With constraints the row always starts from an uncovered interaction. If it cannot be
+    completed to a valid test, it is marked as covered and None is returned.
+    """
+    num_factors = len(coverage.sizes)
+    row = [None] * num_factors
+
+    first = max(range(num_factors), key=lambda i: max(coverage.counts[i]))
+    value = max(range(coverage.sizes[first]), key=lambda v: coverage.counts[first][v])
+    params, values = (first,), (value,)
+    if coverage.strength > 2 or constraints is not None:
+        params, values = coverage.find_uncovered(first, value)
+
+    for factor, value in zip(params, values):
+        row[factor] = value
+
+    rest = sorted((i for i in range(num_factors) if row[i] is None), key=lambda i: -max(coverage.counts[i]))
+    if complete_greedy_row(coverage, row, rest, constraints):
+        return row
+    coverage.cover(params, values)
+    return None
+
+
+def iter_greedy_rows(coverage, constraints=None):
+    """
+    Yield rows of value indexes added by the greedy engine until all interactions are covered.
+    """
+    while coverage.remaining:
+        row = build_greedy_row(coverage, constraints)
+        if row is None:
+            continue
+        coverage.cover_row(row)
+        yield row
+
+
+def iter_greedy_coverage_array(factors, strength=2, constraints=None):
+    """
+    Construction of a set of tests to cover all t-tuples with the incremental greedy engine,
+    yielding every test as soon as it is built.
+    The cost of each test depends on the number of interactions, not on the product of factor sizes.
+    """
+    coverage = InteractionIndex((len(factor) for factor in factors), strength)
+    if constraints is not None:
+        coverage.exclude(constraints)
+
+    for row in iter_greedy_rows(coverage, constraints):
+        yield tuple(factor[value] for factor, value in zip(factors, row))
+
+
+def extend_coverage_array(tests, factors, strength=2, forbidden=(), predicates=()):
+    """
+    Extension of an existing set of tests after factors or values were added, instead of building
+    a new set from scratch. New values must be appended to the ends of their factors and new factors
+    to the end of the list, so that old tests keep their meaning. Old tests come first and in order:
+    without new factors they are kept as they are, otherwise each of them gets values of the new
+    factors covering the most uncovered interactions (IPOG horizontal growth). Then only the tests
+    needed for the still uncovered interactions are appended.
+    :param tests: Already executed tests, tuples of values of the leading factors.
+    :param factors: The new list of factors.
+    :return: The extended set of tests.
+    """
+    constraints = None
+    if forbidden or predicates:
+        constraints = Constraints.from_factors(factors, forbidden, predicates)
+
+    coverage = InteractionIndex((len(factor) for factor in factors), strength)
+    if constraints is not None:
+        coverage.exclude(constraints)
+
+    seeds = [
+        [factor.index(value) for factor, value in zip(factors, test)] + [None] * (len(factors) - len(test))
+        for test in tests
+    ]
+    for test, row in zip(tests, seeds):
+        if constraints is not None and not constraints.is_valid(row):
+            raise ValueError(f"Test {test} is forbidden by the constraints")
+        coverage.cover_row(row)
+
+    for test, row in zip(tests, seeds):
+        new_factors = [i for i, value in enumerate(row) if value is None]
+        if new_factors:
+            if not complete_greedy_row(coverage, row, new_factors, constraints):
+                raise ValueError(f"Test {test} cannot be extended to the new factors")
+            coverage.cover_row(row)
+
+    rows = seeds + list(iter_greedy_rows(coverage, constraints))
+    return [tuple(factor[value] for factor, value in zip(factors, row)) for row in rows]
+
+
+def iter_coverage_array(factors, mode="greedy", strength=2, workers=None, forbidden=(), predicates=()):
+    """
+    Construction of a minimal set of tests to cover all pairs (or all t-tuples for strength t).
+    Returns an iterator that yields every test as soon as it is fixed, so the tests can be consumed
+    before the construction finishes.
+    With constraints every test is valid and every pair that can appear in a valid test is covered.
+    :param mode: 'greedy' for the incremental engine, 'exact' for exhaustive search of every test.
+    :param workers: Number of processes for the exact search, the search is sequential by default.
+    Only the exact search runs in parallel, more than one worker with another mode raises ValueError.
+    :param forbidden: Combinations of (factor index, value) items that must not appear together in a test.
+    :param predicates: (factor i, factor j, function(value_i, value_j)) triples, the function is False for
+    forbidden pairs of values.
+    """
+    if workers and workers > 1 and mode != "exact":
+        raise ValueError(f"Parallel search (workers = {workers}) is only available in the 'exact' mode")
+
+    constraints = None
+    if forbidden or predicates:
+        constraints = Constraints.from_factors(factors, forbidden, predicates)
+
+    if mode == "greedy":
+        return iter_greedy_coverage_array(factors, strength, constraints)
+    if mode == "exact":
+        if workers and workers > 1:
+            return iter_parallel_exact_coverage_array(factors, strength, workers, constraints)
+        return iter_exact_coverage_array(factors, strength, constraints)
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def build_coverage_array(factors, mode="greedy", strength=2, workers=None, forbidden=(), predicates=()):
+    """
+    Construction of a minimal set of tests to cover all pairs (or all t-tuples for strength t).
+    Parameters are the same as for iter_coverage_array.
+    """
+    return list(iter_coverage_array(factors, mode, strength, workers, forbidden, predicates))
+
+
+def print_coverage_array(factors, mode="greedy", strength=2, workers=None, forbidden=(), predicates=()):
+    covering_arrays = build_coverage_array(factors, mode, strength, workers, forbidden, predicates)
 
     print(f"CAN = {len(covering_arrays)}\nGenerated set of tests in CA:")
-    for i, test in enumerate(covering_arrays, 1):
-        print(f"\tTest {i}: {test}")
+    sys.stdout.writelines(f"\tTest {i}: {test}\n" for i, test in enumerate(covering_arrays, 1))
 
 
 if __name__ == "__main__":
@@ -71,3 +326,8 @@ if __name__ == "__main__":
     ]
 
     print_coverage_array(factors)
+
+    print("\nWithout Internet Explorer on Linux:")
+    print_coverage_array(factors, predicates=[
+        (4, 5, lambda browser, system: not (browser == 'Internet Explorer' and system.startswith('Linux')))
+    ])
@@ -0,0 +1,334 @@
+import bisect
+import itertools
+from math import comb, prod
+
+
+class InteractionIndex:
+    """
+    Uncovered t-way interactions of parameter values stored in one flat byte map.
+    A t-subset of parameters is ranked with the combinatorial number system (colex order), a tuple
+    of values inside the subset is ranked in mixed radix, so every interaction has its own cell
+    and all lookups are O(1). Per-(parameter, value) counters of uncovered interactions are
+    updated together with the map. With fewer parameters than t there are no t-subsets and the index is empty.
+    """
+
+    def __init__(self, sizes, strength=2):
+        self.sizes = list(sizes)
+        self.strength = strength
+        num_params = len(self.sizes)
+
+        if strength < 1:
+            raise ValueError("Strength must be at least 1")
+
+        self.binomials = [[comb(m, k) for m in range(num_params + 1)] for k in range(strength + 1)]
+
+        block_sizes = [0] * comb(num_params, strength)
+        for params in itertools.combinations(range(num_params), strength):
+            block_sizes[self.rank(params)] = prod(self.sizes[p] for p in params)
+
+        self.offsets = [0]
+        for size in block_sizes:
+            self.offsets.append(self.offsets[-1] + size)
+        self.total = self.offsets[-1]
+        self.remaining = self.total
+        self.uncovered = bytearray(b"\x01") * self.total
+
+        self.counts = []
+        for p, size in enumerate(self.sizes):
+            others = self.sizes[:p] + self.sizes[p + 1:]
+            self.counts.append([elementary_symmetric(others, strength - 1)] * size)
+
+    def rank(self, params):
+        """
+        Rank of a sorted tuple of parameters among all t-subsets.
+        """
+        return sum(self.binomials[k][p] for k, p in enumerate(params, 1))
+
+    def unrank(self, rank):
+        """
+        Sorted tuple of parameters with the given rank.
+        """
+        params = []
+        for k in range(self.strength, 0, -1):
+            p = bisect.bisect_right(self.binomials[k], rank) - 1
+            params.append(p)
+            rank -= self.binomials[k][p]
+        return tuple(reversed(params))
+
+    def index(self, params, values):
+        """
+        Flat index of an interaction given by sorted parameters and their values.
+        """
+        cell = 0
+        for p, value in zip(params, values):
+            cell = cell * self.sizes[p] + value
+        return self.offsets[self.rank(params)] + cell
+
+    def decode(self, flat):
+        """
+        Parameters and values of the interaction with the given flat index.
+        """
+        rank = bisect.bisect_right(self.offsets, flat) - 1
+        params = self.unrank(rank)
+        cell = flat - self.offsets[rank]
+        values = []
+        for p in reversed(params):
+            cell, value = divmod(cell, self.sizes[p])
+            values.append(value)
+        return params, tuple(reversed(values))
+
+    def is_uncovered(self, params, values):
+        return self.uncovered[self.index(params, values)]
+
+    def cover(self, params, values):
+        """
+        Mark one interaction as covered, return True if it was uncovered.
+        """
+        flat = self.index(params, values)
+        if not self.uncovered[flat]:
+            return False
+        self.uncovered[flat] = 0
+        self.remaining -= 1
+        for p, value in zip(params, values):
+            self.counts[p][value] -= 1
+        return True
+
+    def gains(self, row, fixed, param):
+        """
+        Number of uncovered interactions covered by each value of param in a row where
+        the parameters in fixed already have values.
+        """
+        size = self.sizes[param]
+        gained = [0] * size
+        for others in itertools.combinations(fixed, self.strength - 1):
+            rank = cell = 0
+            stride = None
+            for k, p in enumerate(sorted(others + (param,)), 1):
+                rank += self.binomials[k][p]
+                cell = cell * self.sizes[p] + (0 if p == param else row[p])
+                if p == param:
+                    stride = 1
+                elif stride is not None:
+                    stride *= self.sizes[p]
+            base = self.offsets[rank] + cell
+            for value, flag in enumerate(self.uncovered[base:base + size * stride:stride]):
+                gained[value] += flag
+        return gained
+
+    def find_uncovered(self, param, value):
+        """
+        Some uncovered interaction that contains param set to value, or None.
+        """
+        others = [p for p in range(len(self.sizes)) if p != param]
+        for group in itertools.combinations(others, self.strength - 1):
+            params = tuple(sorted(group + (param,)))
+            position = params.index(param)
+            for rest in itertools.product(*(range(self.sizes[p]) for p in group)):
+                values = rest[:position] + (value,) + rest[position:]
+                if self.uncovered[self.index(params, values)]:
+                    return params, values
+        return None
+
+    def exclude(self, constraints):
+        """
+        Mark interactions containing a forbidden combination as covered: no valid test can cover them.
+        """
+        for combination in constraints.forbidden:
+            if len(combination) > self.strength:
+                continue
+            fixed = dict(combination)
+            others = [p for p in range(len(self.sizes)) if p not in fixed]
+            for group in itertools.combinations(others, self.strength - len(combination)):
+                params = tuple(sorted(group + tuple(fixed)))
+                for rest in itertools.product(*(range(self.sizes[p]) for p in group)):
+                    values = dict(zip(group, rest))
+                    values.update(fixed)
+                    self.cover(params, tuple(values[p] for p in params))
+
+    def row_cells(self, row):
+        """
+        Flat indexes and parameters of all interactions of a row.
+        Parameters set to None or -1 are treated as not assigned. Subsets of parameters are walked
+        depth-first, so rank and cell of every interaction are built incrementally.
+        """
+        assigned = [p for p, value in enumerate(row) if value is not None and value != -1]
+
+        def walk(start, k, rank, cell, params):
+            if k > self.strength:
+                yield self.offsets[rank] + cell, params
+                return
+            binomials = self.binomials[k]
+            for pos in range(start, len(assigned) - self.strength + k):
+                p = assigned[pos]
+                yield from walk(pos + 1, k + 1, rank + binomials[p], cell * self.sizes[p] + row[p], params + (p,))
+
+        return walk(0, 1, 0, 0, ())
+
+    def count_row(self, row):
+        """
+        Number of uncovered interactions of a row.
+        """
+        return sum(self.uncovered[flat] for flat, _ in self.row_cells(row))
+
+    def cover_row(self, row):
+        """
+        Mark all interactions of a row as covered and return how many of them were uncovered.
+        """
+        newly_covered = 0
+        for flat, params in self.row_cells(row):
+            if self.uncovered[flat]:
+                self.uncovered[flat] = 0
+                for p in params:
+                    self.counts[p][row[p]] -= 1
+                newly_covered += 1
+        self.remaining -= newly_covered
+        return newly_covered
+
+
+def elementary_symmetric(numbers, degree):
+    """
+    Sum of products of all combinations of the given degree (number of t-tuples of values).
+    """
+    sums = [1] + [0] * degree
+    for number in numbers:
+        for k in range(degree, 0, -1):
+            sums[k] += sums[k - 1] * number
+    return sums[degree]
+
+
+class Constraints:
+    """
+    Forbidden combinations of parameter values compiled into a per-(parameter, value) index.
+    A forbidden combination is a tuple of (parameter, value index) items that must not appear together
+    in a test. A predicate is a (parameter i, parameter j, function(value_i, value_j)) triple, it is
+    False for forbidden pairs of values and is expanded into forbidden pairs once, at compile time.
+    Cells of a row set to None or -1 are not assigned and never complete a forbidden combination.
+    """
+
+    def __init__(self, sizes, forbidden=(), predicates=()):
+        self.sizes = list(sizes)
+        self.forbidden = set()
+        self.index = [[[] for _ in range(size)] for size in self.sizes]
+        self.related = [set() for _ in self.sizes]
+
+        for combination in forbidden:
+            self.forbid(combination)
+        for i, j, predicate in predicates:
+            for value_i in range(self.sizes[i]):
+                for value_j in range(self.sizes[j]):
+                    if not predicate(value_i, value_j):
+                        self.forbid(((i, value_i), (j, value_j)))
+
+    @classmethod
+    def from_factors(cls, factors, forbidden=(), predicates=()):
+        """
+        Compile constraints given over named factor values: forbidden combinations of (factor, value)
+        items and predicates over pairs of values.
+        """
+        forbidden = [tuple((i, factors[i].index(value)) for i, value in combination) for combination in forbidden]
+        predicates = [
+            (i, j, lambda value_i, value_j, i=i, j=j, predicate=predicate: predicate(factors[i][value_i], factors[j][value_j]))
+            for i, j, predicate in predicates
+        ]
+        return cls((len(factor) for factor in factors), forbidden, predicates)
+
+    def forbid(self, combination):
+        combination = tuple(sorted(combination))
+        if combination in self.forbidden:
+            return
+        self.forbidden.add(combination)
+        for p, value in combination:
+            self.index[p][value].append(combination)
+            self.related[p].update(q for q, _ in combination if q != p)
+
+    def allows(self, row, param, value):
+        """
+        True if setting param to value does not complete a forbidden combination with the other cells of the row.
+        """
+        for combination in self.index[param][value]:
+            if all(p == param or row[p] == v for p, v in combination):
+                return False
+        return True
+
+    def is_valid(self, row):
+        return all(value is None or value == -1 or self.allows(row, p, value) for p, value in enumerate(row))
+
+    def complete(self, row, params, candidates, unset=None):
+        """
+        Assign values to params of a partial row so that the row stays valid, trying values in the order
+        given by candidates(row, param). Backtracks on dead ends and checks ahead that every related
+        parameter still has an allowed value. Returns False (leaving params unset) if there is no completion.
+        """
+        if not params:
+            return True
+
+        param, rest = params[0], params[1:]
+        for value in candidates(row, param):
+            if not self.allows(row, param, value):
+                continue
+            row[param] = value
+            if all(
+                any(self.allows(row, q, w) for w in range(self.sizes[q]))
+                for q in self.related[param] if q in rest
+            ) and self.complete(row, rest, candidates, unset):
+                return True
+        row[param] = unset
+        return False
+
+
+def value_masks(rows, sizes):
+    """
+    For every (parameter, value) an integer mask with the byte of row r set to 1 if the row has that
+    value. The AND of masks is non-zero iff some row has all the values, and its bit count is the number
+    of such rows, so interactions are checked over all rows at once. Cells set to None or -1 match nothing.
+    """
+    masks = []
+    for p, size in enumerate(sizes):
+        column = [size if value is None or value < 0 else value for value in (row[p] for row in rows)]
+        if size < 256:
+            column = bytes(column)
+            masks.append([
+                int.from_bytes(column.translate(bytes(int(byte == value) for byte in range(256))), "little")
+                for value in range(size)
+            ])
+        else:
+            masks.append([int.from_bytes(bytes(int(x == value) for x in column), "little") for value in range(size)])
+    return masks
+
+
+def find_missing_interactions(rows, sizes, strength=2, constraints=None):
+    """
+    All t-way interactions not covered by the rows, as (parameters, values) pairs.
+    With constraints, interactions containing a forbidden combination are not required.
+    """
+    masks = value_masks(rows, sizes)
+    num_params = len(sizes)
+    missing = []
+
+    def walk(start, params, values, mask):
+        for p in range(start, num_params - strength + len(params) + 1):
+            for value in range(sizes[p]):
+                current = masks[p][value] if mask is None else mask & masks[p][value]
+                if len(params) + 1 < strength:
+                    walk(p + 1, params + (p,), values + (value,), current)
+                elif not current:
+                    missing.append((params + (p,), values + (value,)))
+
+    walk(0, (), (), None)
+
+    if constraints is not None:
+        def partial_row(params, values):
+            row = [None] * num_params
+            for p, value in zip(params, values):
+                row[p] = value
+            return row
+
+        missing = [(params, values) for params, values in missing if constraints.is_valid(partial_row(params, values))]
+    return missing
+
+
+def is_covering_array(rows, sizes, strength=2, constraints=None):
+    """
+    True if the rows cover every t-way interaction (every allowed one with constraints).
+    """
+    return not find_missing_interactions(rows, sizes, strength, constraints)
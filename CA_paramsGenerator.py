@@ -1,10 +1,19 @@
 import itertools
+import math
+import os
 import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
+from CA_interactions import Constraints, InteractionIndex
 
-def generate_mixed_covering_array(params_values):
+
+def generate_legacy_covering_array(params_values):
     """
-    Generates a minimized mixed covering array of strength 2 for the given parameters and their possible values.
+    Generates a mixed covering array of strength 2 keeping all uncovered pairs in a set of tuples.
+    Kept to reproduce arrays built by earlier versions of the generator.
     :param params_values: A list where each element is the number of values for each parameter.
     :return: A 2D list representing the covering array.
     """
@@ -40,13 +49,209 @@ def generate_mixed_covering_array(params_values):
     return covering_array
 
 
-def print_coverage_array(params_values):
-    covering_arrays = generate_mixed_covering_array(params_values)
+def iter_compact_covering_array(params_values, strength=2, constraints=None):
+    """
+    Generates a mixed covering array of strength t row by row, yielding every row as soon as it is fixed,
+    keeping uncovered t-tuples in the flat byte map
+    of InteractionIndex (for strength 2 the pair of values (v_i, v_j) of parameters i, j is the cell
+    v_i * |V_j| + v_j of their block). Every row takes uncovered t-tuples in random order (partial
+    Fisher-Yates shuffle) until all parameters are set, then all uncovered t-tuples matched by
+    the row are cleared.
+    With constraints, t-tuples that would complete a forbidden combination with the row are skipped and
+    the free parameters get random allowed values with backtracking. If that fails, the row is rebuilt
+    from its first t-tuple alone, and a t-tuple that cannot appear in any valid row is dropped.
+    :param params_values: A list where each element is the number of values for each parameter.
+    :param strength: Strength t of the covering array.
+    :param constraints: Compiled Constraints over value indexes.
+    :return: An iterator over the rows of the covering array.
+    """
+    num_params = len(params_values)
+    coverage = InteractionIndex(params_values, strength)
+    if constraints is not None:
+        coverage.exclude(constraints)
+    pool = [pair for pair in range(coverage.total) if coverage.uncovered[pair]]
+
+    def random_values(row, param):
+        values = list(range(params_values[param]))
+        random.shuffle(values)
+        return values
+
+    while coverage.remaining:
+        current_row = [-1] * num_params
+        unset = num_params
+        seed = None
+
+        for pos in range(len(pool)):
+            swap = random.randrange(pos, len(pool))
+            pool[pos], pool[swap] = pool[swap], pool[pos]
+            if not coverage.uncovered[pool[pos]]:
+                continue
+
+            params, values = coverage.decode(pool[pos])
+            if all(current_row[p] in {-1, v} for p, v in zip(params, values)):
+                new = [p for p in params if current_row[p] == -1]
+                for p, v in zip(params, values):
+                    current_row[p] = v
+                if constraints is not None and not all(constraints.allows(current_row, p, current_row[p]) for p in new):
+                    for p in new:
+                        current_row[p] = -1
+                    continue
+                seed = seed or (params, values)
+                unset -= len(new)
+                if not unset:
+                    break
+
+        if constraints is None:
+            coverage.cover_row(current_row)
+
+            for idx in range(num_params):
+                if current_row[idx] == -1:
+                    current_row[idx] = random.randint(0, params_values[idx] - 1)
+        else:
+            free = [idx for idx in range(num_params) if current_row[idx] == -1]
+            if not constraints.complete(current_row, free, random_values, -1):
+                current_row = [-1] * num_params
+                for p, v in zip(*seed):
+                    current_row[p] = v
+                free = [idx for idx in range(num_params) if current_row[idx] == -1]
+                if not constraints.complete(current_row, free, random_values, -1):
+                    coverage.cover(*seed)
+                    continue
+            coverage.cover_row(current_row)
+
+        yield current_row
+        if len(pool) > 2 * coverage.remaining:
+            pool = [pair for pair in pool if coverage.uncovered[pair]]
+
+
+def iter_mixed_covering_array(params_values, mode="compact", strength=2, forbidden=(), predicates=()):
+    """
+    Generates a minimized mixed covering array of strength t (2 by default) for the given parameters and their possible values.
+    The compact mode yields every row as soon as it is fixed, so rows can be consumed before the generation finishes.
+    :param params_values: A list where each element is the number of values for each parameter.
+    :param mode: 'compact' for byte map tracking, 'legacy' to reproduce arrays of the set-based version.
+    :param strength: Strength t of the covering array, the legacy mode supports only strength 2.
+    :param forbidden: Combinations of (parameter, value) items that must not appear together in a row.
+    :param predicates: (parameter i, parameter j, function(v_i, v_j)) triples, the function is False for
+    forbidden pairs of values. With constraints every row is valid and every t-tuple that can appear
+    in a valid row is covered.
+    :return: An iterator over the rows of the covering array.
+    """
+    constraints = None
+    if forbidden or predicates:
+        constraints = Constraints(params_values, forbidden, predicates)
+
+    if mode == "compact":
+        return iter_compact_covering_array(params_values, strength, constraints)
+    if mode == "legacy":
+        if strength != 2 or constraints is not None:
+            raise ValueError("Legacy mode supports only strength 2 without constraints")
+        return iter(generate_legacy_covering_array(params_values))
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def generate_mixed_covering_array(params_values, mode="compact", strength=2, forbidden=(), predicates=()):
+    """
+    Generates a minimized mixed covering array of strength t (2 by default) for the given parameters and their possible values.
+    Parameters are the same as for iter_mixed_covering_array.
+    :return: A 2D list representing the covering array.
+    """
+    return list(iter_mixed_covering_array(params_values, mode, strength, forbidden, predicates))
+
+
+def _seeded_restart(params_values, strength, seed, constraints):
+    """
+    One restart of the compact generator with its own seed (runs in a worker process).
+    """
+    random.seed(seed)
+    return list(iter_compact_covering_array(params_values, strength, constraints))
+
+
+def covering_array_lower_bound(params_values, strength=2):
+    """
+    Lower bound of CAN: the product of the t largest numbers of values.
+    """
+    return math.prod(sorted(params_values, reverse=True)[:strength])
+
+
+def search_covering_array(params_values, restarts=8, workers=None, time_budget=None, strength=2, seed=0,
+                          forbidden=(), predicates=()):
+    """
+    Runs independent seeded restarts of the compact generator in a process pool and keeps the smallest array.
+    Restart k uses seed + k, ties are broken by the lowest restart number, so the array does not depend on
+    the number of workers. Without constraints the search stops early once the lower bound of CAN is reached
+    (constraints can make arrays smaller than the bound); the list of CANs then ends at the restart that reached
+    it, so it does not depend on the number of workers either. With a time budget
+    no new restarts are started after it runs out (restarts already running are finished, the first restart
+    is always run), and restarts may be None to run until the budget is spent. Which restarts fit into
+    the budget depends on the machine and the number of workers.
+    :param params_values: A list where each element is the number of values for each parameter.
+    :param restarts: Maximal number of restarts.
+    :param workers: Number of processes, all CPUs by default.
+    :param time_budget: Time budget of the search in seconds.
+    :param forbidden: Forbidden combinations, see generate_mixed_covering_array.
+    :param predicates: Predicates over pairs of values, see generate_mixed_covering_array.
+    :return: The smallest covering array and the list of CANs of the finished restarts in order of restarts.
+    """
+    if restarts is None and time_budget is None:
+        raise ValueError("Either restarts or time_budget must be given")
+    if restarts is not None and restarts < 1:
+        raise ValueError("The number of restarts must be at least 1")
+
+    workers = workers or os.cpu_count()
+    constraints = None
+    lower_bound = covering_array_lower_bound(params_values, strength)
+    if forbidden or predicates:
+        constraints = Constraints(params_values, forbidden, predicates)
+        lower_bound = 0
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    results = {}
+    started = 0
+
+    with ProcessPoolExecutor(workers) as executor:
+        running = {}
+
+        def can_start():
+            if restarts is not None and started >= restarts:
+                return False
+            if deadline is not None and started and time.monotonic() >= deadline:
+                return False
+            return not results or min(len(array) for array in results.values()) > lower_bound
+
+        while True:
+            while len(running) < workers and can_start():
+                future = executor.submit(_seeded_restart, params_values, strength, seed + started, constraints)
+                running[future] = started
+                started += 1
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    best = min(results, key=lambda k: (len(results[k]), k))
+    last = best if len(results[best]) <= lower_bound else max(results)
+    return results[best], [len(results[k]) for k in sorted(results) if k <= last]
+
+
+def print_search_covering_array(params_values, restarts=8, workers=None, time_budget=None, strength=2):
+    covering_arrays, cans = search_covering_array(params_values, restarts, workers, time_budget, strength)
+
+    print(f"Restarts = {len(cans)}, lower bound = {covering_array_lower_bound(params_values, strength)}")
+    print("CAN distribution:", ", ".join(f"{can}: {count}" for can, count in sorted(Counter(cans).items())))
+    print(f"CAN = {len(covering_arrays)}\nGenerated set of tests in CA:")
+
+    sys.stdout.writelines(f"\tTest {i}: {test}\n" for i, test in enumerate(covering_arrays, 1))
+
+
+def print_coverage_array(params_values, mode="compact", strength=2):
+    covering_arrays = generate_mixed_covering_array(params_values, mode, strength)
 
     print(f"CAN = {len(covering_arrays)}\nGenerated set of tests in CA:")
 
-    for i, test in enumerate(covering_arrays, 1):
-        print(f"\tTest {i}: {test}")
+    sys.stdout.writelines(f"\tTest {i}: {test}\n" for i, test in enumerate(covering_arrays, 1))
 
 
 if __name__ == "__main__":
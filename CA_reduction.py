@@ -0,0 +1,271 @@
+import itertools
+import math
+import random
+from array import array
+
+from CA_interactions import Constraints, InteractionIndex
+
+
+INFEASIBLE = 1 << 40
+
+
+class CoverageCounts:
+    """
+    Number of rows covering every t-way interaction of a covering array.
+    Cells set to -1 are don't-care and cover nothing. Interactions covered by no row are kept in a list
+    together with their positions, so they are added, removed and sampled in O(1), and a change of one
+    cell touches only the interactions of that cell. With constraints, interactions that cannot appear
+    in any valid row are counted as covered forever; other interactions not covered by the initial rows
+    stay missing.
+    """
+
+    def __init__(self, rows, sizes, strength=2, constraints=None):
+        self.index = InteractionIndex(sizes, strength)
+        self.rows = [list(row) for row in rows]
+        self.counts = array("q", [0]) * self.index.total
+
+        for row in self.rows:
+            for flat, _ in self.index.row_cells(row):
+                self.counts[flat] += 1
+
+        if constraints is not None:
+            def first_values(row, param):
+                return range(self.index.sizes[param])
+
+            for flat in range(self.index.total):
+                if not self.counts[flat]:
+                    row = [-1] * len(self.index.sizes)
+                    for p, value in zip(*self.index.decode(flat)):
+                        row[p] = value
+                    if not constraints.is_valid(row) or not constraints.complete(
+                            row, [p for p, v in enumerate(row) if v == -1], first_values, -1):
+                        self.counts[flat] = INFEASIBLE
+        self.missing = [flat for flat in range(self.index.total) if not self.counts[flat]]
+        self.positions = {flat: pos for pos, flat in enumerate(self.missing)}
+
+    def _increment(self, flat):
+        self.counts[flat] += 1
+        if self.counts[flat] == 1:
+            pos = self.positions.pop(flat)
+            last = self.missing.pop()
+            if last != flat:
+                self.missing[pos] = last
+                self.positions[last] = pos
+
+    def _decrement(self, flat):
+        self.counts[flat] -= 1
+        if not self.counts[flat]:
+            self.positions[flat] = len(self.missing)
+            self.missing.append(flat)
+
+    def cell_interactions(self, row, param, value):
+        """
+        Flat indexes of the interactions of a row that contain param set to value.
+        """
+        if value == -1:
+            return []
+        others = [p for p, v in enumerate(row) if p != param and v != -1]
+        cells = []
+        for group in itertools.combinations(others, self.index.strength - 1):
+            params = tuple(sorted(group + (param,)))
+            cells.append(self.index.index(params, tuple(value if p == param else row[p] for p in params)))
+        return cells
+
+    def unique_count(self, r):
+        """
+        Number of interactions covered only by row r.
+        """
+        return sum(self.counts[flat] == 1 for flat, _ in self.index.row_cells(self.rows[r]))
+
+    def add_row(self, row):
+        self.rows.append(list(row))
+        for flat, _ in self.index.row_cells(row):
+            self._increment(flat)
+
+    def remove_row(self, r):
+        for flat, _ in self.index.row_cells(self.rows[r]):
+            self._decrement(flat)
+        return self.rows.pop(r)
+
+    def move_delta(self, r, param, value):
+        """
+        Change of the number of uncovered interactions if cell (r, param) is set to value.
+        """
+        row = self.rows[r]
+        lost = sum(self.counts[flat] == 1 for flat in self.cell_interactions(row, param, row[param]))
+        gained = sum(not self.counts[flat] for flat in self.cell_interactions(row, param, value))
+        return lost - gained
+
+    def set_cell(self, r, param, value):
+        row = self.rows[r]
+        for flat in self.cell_interactions(row, param, row[param]):
+            self._decrement(flat)
+        row[param] = value
+        for flat in self.cell_interactions(row, param, value):
+            self._increment(flat)
+
+
+def remove_redundant_rows(coverage):
+    """
+    Remove rows all of whose interactions are covered by other rows, starting from the last row
+    (greedy generators add the least useful rows at the end).
+    """
+    for r in range(len(coverage.rows) - 1, -1, -1):
+        if not coverage.unique_count(r):
+            coverage.remove_row(r)
+
+
+def merge_rows(coverage, constraints=None):
+    """
+    Turn cells whose interactions are all covered elsewhere into don't-care cells, then merge
+    every pair of rows that agree on all cells assigned in both. With constraints, rows are merged
+    only if the merged row is valid and can be completed to a valid one, and all don't-care cells are filled
+    with allowed values afterwards.
+    """
+
+    def first_values(row, param):
+        return range(coverage.index.sizes[param])
+
+    def can_complete(row):
+        return constraints.complete(list(row), [p for p, v in enumerate(row) if v == -1], first_values, -1)
+
+    for r, row in enumerate(coverage.rows):
+        for param in range(len(row)):
+            if all(coverage.counts[flat] > 1 for flat in coverage.cell_interactions(row, param, row[param])):
+                coverage.set_cell(r, param, -1)
+
+    i = 0
+    while i < len(coverage.rows):
+        j = i + 1
+        while j < len(coverage.rows):
+            first, second = coverage.rows[i], coverage.rows[j]
+            merged = [b if a == -1 else a for a, b in zip(first, second)]
+            if all(a == b or a == -1 or b == -1 for a, b in zip(first, second)) and (
+                    constraints is None or constraints.is_valid(merged) and can_complete(merged)):
+                for param, value in enumerate(second):
+                    if first[param] == -1 and value != -1:
+                        coverage.set_cell(i, param, value)
+                coverage.remove_row(j)
+            else:
+                j += 1
+        i += 1
+
+    if constraints is not None:
+        for r, row in enumerate(coverage.rows):
+            filled = list(row)
+            constraints.complete(filled, [p for p, v in enumerate(row) if v == -1], first_values, -1)
+            for param, value in enumerate(filled):
+                if row[param] != value:
+                    coverage.set_cell(r, param, value)
+
+
+def anneal(coverage, moves, rng, constraints=None, temperature=1.0, cooling=0.999):
+    """
+    Simulated annealing over single cell changes until all interactions are covered.
+    Every move takes a random uncovered interaction and a random row and sets one cell of the row
+    to the value of the interaction. Moves that do not increase the number of uncovered interactions
+    are always accepted, others with probability exp(-delta / temperature). Moves that make the row
+    forbidden by the constraints are rejected.
+    :return: The number of moves made.
+    """
+    for move in range(moves):
+        if not coverage.missing:
+            return move
+
+        params, values = coverage.index.decode(rng.choice(coverage.missing))
+        r = rng.randrange(len(coverage.rows))
+        param, value = rng.choice([(p, v) for p, v in zip(params, values) if coverage.rows[r][p] != v])
+        if constraints is not None and not constraints.allows(coverage.rows[r], param, value):
+            continue
+
+        delta = coverage.move_delta(r, param, value)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            coverage.set_cell(r, param, value)
+        temperature = max(temperature * cooling, 0.01)
+
+    return moves
+
+
+def reduce_covering_array(covering_array, params_values, strength=2, moves=20000, seed=0, keep_dont_care=False,
+                          forbidden=(), predicates=()):
+    """
+    Post-optimization of a finished covering array over integer domains: removes redundant rows,
+    merges rows using don't-care cells, then repeatedly drops the row with the fewest uniquely covered
+    interactions and repairs the array with simulated annealing while the move budget lasts.
+    :param covering_array: A 2D list of value indexes covering all t-tuples.
+    :param params_values: A list where each element is the number of values for each parameter.
+    :param moves: Total budget of annealing moves.
+    :param keep_dont_care: Keep don't-care cells as -1 instead of filling them with the first value
+    (with constraints they are always filled with allowed values).
+    :param forbidden: Forbidden combinations the array was built with, see generate_mixed_covering_array.
+    :param predicates: Predicates over pairs of values, see generate_mixed_covering_array.
+    :return: A 2D list representing the reduced covering array.
+    """
+    return _reduce(covering_array, params_values, strength, moves, seed, keep_dont_care,
+                   Constraints(params_values, forbidden, predicates) if forbidden or predicates else None)
+
+
+def _reduce(covering_array, params_values, strength, moves, seed, keep_dont_care, constraints):
+    coverage = CoverageCounts(covering_array, params_values, strength, constraints)
+    if coverage.missing:
+        raise ValueError("The array does not cover all interactions")
+
+    remove_redundant_rows(coverage)
+    merge_rows(coverage, constraints)
+
+    rng = random.Random(seed)
+    best = [list(row) for row in coverage.rows]
+    while moves > 0 and len(coverage.rows) > 1:
+        coverage.remove_row(min(range(len(coverage.rows)), key=coverage.unique_count))
+        moves -= anneal(coverage, moves, rng, constraints)
+        if coverage.missing:
+            break
+        best = [list(row) for row in coverage.rows]
+
+    if keep_dont_care and constraints is None:
+        return best
+    return [[max(value, 0) for value in row] for row in best]
+
+
+def reduce_named_covering_array(tests, factors, strength=2, moves=20000, seed=0, keep_dont_care=False,
+                                forbidden=(), predicates=()):
+    """
+    Post-optimization of a finished covering array over named factor values (see reduce_covering_array).
+    Don't-care cells are kept as None when keep_dont_care is set, constraints are given as for build_coverage_array.
+    """
+    rows = [[factor.index(value) for factor, value in zip(factors, test)] for test in tests]
+    constraints = Constraints.from_factors(factors, forbidden, predicates) if forbidden or predicates else None
+    reduced = _reduce(rows, [len(factor) for factor in factors], strength, moves, seed, keep_dont_care, constraints)
+    return [tuple(None if value == -1 else factor[value] for factor, value in zip(factors, row)) for row in reduced]
+
+
+if __name__ == "__main__":
+    from CA_factorsGenerator import build_coverage_array
+    from CA_interactions import is_covering_array
+    from CA_paramsGenerator import generate_mixed_covering_array
+
+    factors = [
+        ['1 страница', '2 страницы', '7 страниц'],
+        ['Нет цветных рисунков', 'Есть цветные рисунки'],
+        ['A4', 'A5', 'B5', 'Letter', 'Envelop'],
+        ['HP', 'Epson', 'Canon', 'Xerox'],
+        ['Internet Explorer', 'Mozilla Firefox', 'Opera'],
+        ['Windows Me', 'Windows 2000', 'Windows XP', 'Linux SUSE 10.0', 'Linux RHEL 4.0']
+    ]
+    tests = build_coverage_array(factors)
+    print(f"Factors: CAN = {len(tests)} -> {len(reduce_named_covering_array(tests, factors))}")
+
+    random.seed(0)
+    params_values = [4, 2, 2, 2, 2, 2, 2, 2]
+    covering_array = generate_mixed_covering_array(params_values)
+    print(f"Params: CAN = {len(covering_array)} -> {len(reduce_covering_array(covering_array, params_values))}")
+
+    params_values = [2, 2, 2, 3]
+    forbidden = [((1, 1), (2, 1))]
+    covering_array = [[0, 0, 0, 2], [1, 1, 0, 1], [0, 0, 0, 0], [1, 0, 1, 2],
+                      [0, 1, 0, 0], [1, 0, 1, 0], [1, 1, 0, 2], [0, 0, 1, 1]]
+    reduced = reduce_covering_array(covering_array, params_values, forbidden=forbidden)
+    constraints = Constraints(params_values, forbidden)
+    assert all(constraints.is_valid(row) for row in reduced), "Reduced array contains a forbidden row"
+    assert is_covering_array(reduced, params_values, constraints=constraints), "Reduced array lost an interaction"
+    print(f"Constrained: CAN = {len(covering_array)} -> {len(reduced)}")
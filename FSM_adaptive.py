@@ -0,0 +1,200 @@
+from collections import deque
+
+from FSM_compiled import compile_fsm
+from FSM_stats_and_W_Wp_tests import SplittingTree, generate_rciws_tests, get_state_cover, join_sequence
+
+
+class AdaptiveSplittingTree(SplittingTree):
+    """
+    Splitting tree of the Lee-Yannakakis algorithm. Every round splits all leaves of the largest size using
+    only valid inputs (inputs that never merge two states of the block with equal outputs):
+    a-valid inputs give different outputs, b-valid inputs lead into different leaves (the witness continues
+    with the witness of their lowest common ancestor), and c-valid inputs map the block onto another block
+    of the same size split in the round (the witness continues with the witness of that block).
+    If a block of the largest size cannot be split, the machine has no adaptive distinguishing sequence
+    and complete is False.
+    """
+
+    def __init__(self, fsm, states, inputs):
+        self.fsm = compile_fsm(fsm, inputs)
+        self.inputs = list(inputs)
+        ids = self._state_ids(states)
+        outside = [self.fsm.states[s] for s in self._closure(ids)[len(set(ids)):]]
+        if outside:
+            raise ValueError(f"States are not closed under transitions, missing: {sorted(outside, key=str)}")
+        self.parent = [None]
+        self.depth = [0]
+        self.witness = [None]
+        self.leaf = dict.fromkeys(ids, 0)
+        self.members = {0: ids}
+        self.complete = True
+
+        while self.complete and any(len(members) > 1 for members in self.members.values()):
+            self.complete = self._split_largest()
+
+    def _columns(self, inp):
+        i = self.fsm.input_ids[inp]
+        return self.fsm.next_columns[i], self.fsm.output_columns[i]
+
+    def _split_largest(self):
+        size = max(len(members) for members in self.members.values())
+        largest = [node for node, members in self.members.items() if len(members) == size]
+        snapshot = dict(self.leaf)
+        splits = {}
+        implied = {}
+
+        for node in largest:
+            block = self.members[node]
+            valid = []
+            for inp in self.inputs:
+                next_column, output_column = self._columns(inp)
+                if len({(output_column[s], next_column[s]) for s in block}) == len(block):
+                    valid.append((inp, next_column, output_column))
+
+            for inp, next_column, output_column in valid:
+                if len({output_column[s] for s in block}) > 1:
+                    splits[node] = ((inp,), output_column.__getitem__)
+                    break
+            else:
+                for inp, next_column, output_column in valid:
+                    successors = {snapshot[next_column[s]] for s in block}
+                    if len(successors) > 1:
+                        ancestor = self.lca(successors)
+                        splits[node] = ((inp,) + self.witness[ancestor], lambda s, next_column=next_column, ancestor=ancestor:
+                                        self.child_towards(ancestor, snapshot[next_column[s]]))
+                        break
+                    target = successors.pop()
+                    if target != node:
+                        implied.setdefault(target, []).append((node, inp, next_column))
+
+        queue = deque(splits)
+        while queue:
+            target = queue.popleft()
+            witness, key = splits[target]
+            for node, inp, next_column in implied.get(target, ()):
+                if node not in splits:
+                    splits[node] = ((inp,) + witness, lambda s, next_column=next_column, key=key: key(next_column[s]))
+                    queue.append(node)
+
+        if len(splits) < len(largest):
+            return False
+
+        for node, (witness, key) in splits.items():
+            self.witness[node] = witness
+            parts = {}
+            for s in self.members.pop(node):
+                parts.setdefault(key(s), []).append(s)
+            for part in parts.values():
+                child = self._new_node(node)
+                self.members[child] = part
+                for s in part:
+                    self.leaf[s] = child
+        return True
+
+
+def get_adaptive_distinguishing_sequence(fsm, states, inputs):
+    """
+    Adaptive distinguishing sequence of the states built from the Lee-Yannakakis splitting tree.
+    :return: A tree of {"input": sequence, "children": {response: subtree}} nodes with {"state": state} leaves,
+    or None if the machine has no adaptive distinguishing sequence.
+    """
+    tree = AdaptiveSplittingTree(fsm, states, inputs)
+    if not tree.complete:
+        return None
+
+    compiled = tree.fsm
+    ids = [compiled.state_ids[state] for state in states]
+    root = {}
+    stack = [(root, ids, ids)]
+    while stack:
+        node, initial, current = stack.pop()
+        if len(initial) == 1:
+            node["state"] = compiled.states[initial[0]]
+            continue
+        witness = tree.witness[tree.lca(tree.leaf[s] for s in current)]
+        final, outputs = compiled.run(current, witness)
+        groups = {}
+        for k, response in enumerate(zip(*outputs)):
+            groups.setdefault("".join(compiled.outputs[o] for o in response), []).append(k)
+        node["input"] = join_sequence(witness, tree.inputs)
+        node["children"] = {}
+        for response, positions in groups.items():
+            child = node["children"][response] = {}
+            stack.append((child, [initial[k] for k in positions], [final[k] for k in positions]))
+    return root
+
+
+def get_adaptive_identifying_sets(fsm, states, inputs):
+    """
+    For every state the inputs applied by the adaptive distinguishing sequence when the machine starts in it,
+    in the form of get_identifying_sets (a one-element set per state), or None if there is no such sequence.
+    """
+    ads = get_adaptive_distinguishing_sequence(fsm, states, inputs)
+    if ads is None:
+        return None
+    sets = {}
+    stack = [(ads, "")]
+    while stack:
+        node, path = stack.pop()
+        if "state" in node:
+            sets[node["state"]] = {path}
+        else:
+            stack.extend((child, join_sequence(filter(None, (path, node["input"])), inputs))
+                         for child in node["children"].values())
+    return {state: sets[state] for state in states}
+
+
+def generate_ds_method_tests(fsm, states, inputs, reset_symbol, initial_state):
+    """
+    DS-method suite: every state cover sequence and every its extension by one input, followed by the inputs of
+    the adaptive distinguishing sequence for the reached state (RCD + RCIDs). None if there is no such sequence.
+    """
+    ads_sets = get_adaptive_identifying_sets(fsm, states, inputs)
+    if ads_sets is None:
+        return None
+    state_cover = get_state_cover(fsm, initial_state, states, inputs)
+    rcd_tests = {reset_symbol + ".".join([c, w]) for c, s in state_cover.items() for w in ads_sets[s]}
+    rcids_tests = generate_rciws_tests(fsm, state_cover, inputs, reset_symbol, ads_sets)
+    return sorted(rcd_tests | rcids_tests, key=len)
+
+
+def print_adaptive_distinguishing_sequence(fsm, states, inputs):
+    ads = get_adaptive_distinguishing_sequence(fsm, states, inputs)
+    if ads is None:
+        print("No adaptive distinguishing sequence")
+        return
+
+    print("Adaptive distinguishing sequence:")
+    stack = [(ads, 1, "")]
+    while stack:
+        node, level, response = stack.pop()
+        prefix = "\t" * level + (f"{response} -> " if response else "")
+        if "state" in node:
+            print(f"{prefix}state {node['state']}")
+        else:
+            print(f"{prefix}apply '{node['input']}'")
+            stack.extend((child, level + 1, out) for out, child in reversed(list(node["children"].items())))
+
+
+def print_ds_method_tests(fsm, states, inputs, reset_symbol, initial_state):
+    ds_tests = generate_ds_method_tests(fsm, states, inputs, reset_symbol, initial_state)
+    if ds_tests is None:
+        print("DS-method test: no adaptive distinguishing sequence")
+        return
+    print(f"DS-method test (RCD + RCIDs) [{len(ds_tests)}, {sum(map(len, ds_tests))} symbols]: {ds_tests}")
+
+
+if __name__ == "__main__":
+    fsm = {
+        0: {'A': (0, 'X'), 'B': (1, 'Y')},
+        1: {'A': (2, 'Y'), 'B': (3, 'X')},
+        2: {'A': (3, 'X'), 'B': (0, 'X')},
+        3: {'A': (3, 'X'), 'B': (0, 'Y')},
+    }
+    states = list(fsm.keys())
+    inputs = ['A', 'B']
+    reset_symbol = 'R'
+    initial_state = 0
+
+    print_adaptive_distinguishing_sequence(fsm, states, inputs)
+    print_ds_method_tests(fsm, states, inputs, reset_symbol, initial_state)
@@ -0,0 +1,65 @@
+import random
+import time
+
+from FSM_stats_and_W_Wp_tests import (
+    generate_h_method_tests, generate_hsi_method_tests, generate_rciw_tests, generate_wp_method_tests,
+    get_characterizing_set, get_state_cover, minimize_tests
+)
+
+
+METHODS = {
+    "W": lambda fsm, states, inputs, reset_symbol, initial_state: generate_rciw_tests(
+        reset_symbol, list(get_state_cover(fsm, initial_state, states, inputs)), inputs,
+        get_characterizing_set(fsm, states, inputs)
+    ),
+    "Wp": generate_wp_method_tests,
+    "HSI": generate_hsi_method_tests,
+    "H": generate_h_method_tests,
+}
+
+
+def random_fsm(num_states, inputs, outputs, seed=0):
+    """
+    Random Mealy machine where every state is reachable from state 0: state k > 0 gets its first incoming
+    transition from a random earlier state, all other transitions are random.
+    """
+    rng = random.Random(seed)
+    fsm = {state: {} for state in range(num_states)}
+    for state in range(1, num_states):
+        free = [(source, inp) for source in range(state) for inp in inputs if inp not in fsm[source]]
+        source, inp = rng.choice(free)
+        fsm[source][inp] = (state, rng.choice(outputs))
+    for state in range(num_states):
+        for inp in inputs:
+            fsm[state].setdefault(inp, (rng.randrange(num_states), rng.choice(outputs)))
+    return fsm
+
+
+def benchmark_methods(sizes=(4, 8, 16, 32, 64), inputs=("A", "B", "C"), outputs=("X", "Y"), seed=0):
+    """
+    Compare test suites of all methods on random machines of increasing size. Prefix tests are removed from
+    every suite before counting, so all methods are compared on what has to be executed.
+    :return: A list of (number of states, method, tests, total symbols, seconds) tuples.
+    """
+    results = []
+    for num_states in sizes:
+        fsm = random_fsm(num_states, list(inputs), list(outputs), seed)
+        states = list(fsm.keys())
+        for name, generate in METHODS.items():
+            start = time.perf_counter()
+            tests = generate(fsm, states, list(inputs), "R", 0)
+            seconds = time.perf_counter() - start
+            tests, _, symbols = minimize_tests(tests, list(inputs), "R")
+            results.append((num_states, name, len(tests), symbols, seconds))
+    return results
+
+
+def print_method_benchmark(sizes=(4, 8, 16, 32, 64)):
+    print(f"\t{'states':>6} | {'method':<6} | {'tests':>7} | {'symbols':>8} | {'time, s':>8}")
+    for num_states, name, tests, symbols, seconds in benchmark_methods(sizes):
+        print(f"\t{num_states:>6} | {name:<6} | {tests:>7} | {symbols:>8} | {seconds:>8.3f}")
+    print()
+
+
+if __name__ == "__main__":
+    print_method_benchmark()
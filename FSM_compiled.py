@@ -0,0 +1,135 @@
+from array import array
+
+
+class CompiledFSM:
+    """
+    A Mealy machine fsm[state][input] = (next state, output) compiled to dense integer ids.
+    Transitions are kept in flat tables next_state[s * |I| + i] and output[s * |I| + i], and per input
+    in columns, so one input symbol is applied to a whole vector of states at once with map over a column.
+    Indexing by a state label gives the transitions of the state in the dict form, so functions written for
+    the dict-of-dicts representation accept the compiled one unchanged.
+    """
+
+    def __init__(self, fsm, inputs=None):
+        self.states = list(fsm.keys())
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        if inputs is None:
+            inputs = list(dict.fromkeys(inp for state in self.states for inp in fsm[state]))
+        self.inputs = list(inputs)
+        self.input_ids = {inp: i for i, inp in enumerate(self.inputs)}
+        self.outputs = []
+        self.output_ids = {}
+
+        width = len(self.inputs)
+        self.next_state = array("l", [0]) * (len(self.states) * width)
+        self.output = array("l", [0]) * (len(self.states) * width)
+        for s, state in enumerate(self.states):
+            for i, inp in enumerate(self.inputs):
+                next_state, output = fsm[state][inp]
+                self.next_state[s * width + i] = self.state_ids[next_state]
+                if output not in self.output_ids:
+                    self.output_ids[output] = len(self.outputs)
+                    self.outputs.append(output)
+                self.output[s * width + i] = self.output_ids[output]
+
+        self.next_columns = [self.next_state[i::width].tolist() for i in range(width)]
+        self.output_columns = [self.output[i::width].tolist() for i in range(width)]
+
+    def __len__(self):
+        return len(self.states)
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def __contains__(self, state):
+        return state in self.state_ids
+
+    def keys(self):
+        return list(self.states)
+
+    def __getitem__(self, state):
+        s = self.state_ids[state]
+        return {
+            inp: (self.states[self.next_columns[i][s]], self.outputs[self.output_columns[i][s]])
+            for i, inp in enumerate(self.inputs)
+        }
+
+    def encode(self, sequence):
+        """
+        Input ids of a sequence of input symbols (a tuple, or a string of one-character inputs).
+        """
+        return [self.input_ids[inp] for inp in sequence]
+
+    def step(self, ids, inp):
+        """
+        Apply input id inp to a vector of state ids.
+        :return: The vectors of next state ids and output ids.
+        """
+        return list(map(self.next_columns[inp].__getitem__, ids)), list(map(self.output_columns[inp].__getitem__, ids))
+
+    def run(self, ids, sequence):
+        """
+        Run a sequence of input symbols from a vector of state ids.
+        :return: The vector of final state ids and the list of output id vectors, one per input.
+        """
+        outputs = []
+        for inp in self.encode(sequence):
+            outputs.append(list(map(self.output_columns[inp].__getitem__, ids)))
+            ids = list(map(self.next_columns[inp].__getitem__, ids))
+        return ids, outputs
+
+    def run_all(self, sequence):
+        """
+        Run a sequence of input symbols from every state at once.
+        """
+        return self.run(range(len(self.states)), sequence)
+
+    def run_batch(self, sequences, ids=None):
+        """
+        Run many sequences from a vector of state ids (all states by default).
+        :return: A list of (final state ids, output id vectors) pairs, one per sequence.
+        """
+        ids = range(len(self.states)) if ids is None else ids
+        return [self.run(ids, sequence) for sequence in sequences]
+
+    def responses(self, ids, sequence):
+        """
+        Output id tuple of every state of the vector for a sequence of input symbols.
+        """
+        _, outputs = self.run(ids, sequence)
+        return list(zip(*outputs)) if outputs else [()] * len(ids)
+
+    def transition(self, state, sequence):
+        """
+        Final state and outputs for a sequence run from one state, as fsm_transition returns them.
+        """
+        s = self.state_ids[state]
+        outputs = []
+        for inp in self.encode(sequence):
+            outputs.append(self.outputs[self.output_columns[inp][s]])
+            s = self.next_columns[inp][s]
+        return self.states[s], outputs
+
+
+def compile_fsm(fsm, inputs=None):
+    """
+    Compile a dict-of-dicts FSM (an already compiled one is returned as it is).
+    """
+    if isinstance(fsm, CompiledFSM):
+        return fsm
+    return CompiledFSM(fsm, inputs)
+
+
+if __name__ == "__main__":
+    fsm = {
+        0: {'A': (0, 'X'), 'B': (1, 'Y')},
+        1: {'A': (2, 'Y'), 'B': (3, 'X')},
+        2: {'A': (3, 'X'), 'B': (0, 'X')},
+        3: {'A': (3, 'X'), 'B': (0, 'Y')},
+    }
+    compiled = compile_fsm(fsm)
+
+    for sequence in ["BA", "BBA"]:
+        final, outputs = compiled.run_all(sequence)
+        print(f"{sequence}: final states {[compiled.states[s] for s in final]}, responses "
+              f"{[''.join(compiled.outputs[o] for o in response) for response in compiled.responses(range(len(compiled)), sequence)]}")
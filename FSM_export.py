@@ -0,0 +1,140 @@
+import json
+import sys
+from array import array
+from heapq import merge
+from itertools import chain
+
+from CA_export import write_json_lines
+from FSM_stats_and_W_Wp_tests import (
+    SequenceTrie, get_characterizing_set, get_identifying_sets, get_state_cover, tokenize_sequence, tokenize_test
+)
+
+
+def _with_suffixes(parts, suffixes):
+    for suffix in suffixes:
+        yield parts + (suffix,)
+
+
+def emit_tests(streams, reset_symbol, inputs, order="length"):
+    """
+    Merge streams of tests given as tuples of parts (state cover sequence, input, identifying sequence) into
+    test strings, dropping tests whose symbol sequence was already emitted.
+    :param streams: Iterables of part tuples, each sorted by test length.
+    :param order: 'length' to emit the shortest tests first (ties in the order of the streams),
+    'state' to emit the streams one after another.
+    :return: An iterator over the test strings.
+    """
+    if order == "length":
+        tests = merge(*streams, key=lambda parts: len(".".join(parts)))
+    elif order == "state":
+        tests = chain.from_iterable(streams)
+    else:
+        raise ValueError(f"Unknown order: {order}")
+
+    trie = SequenceTrie()
+    for parts in tests:
+        if trie.add(tuple(chain((reset_symbol,), *(tokenize_sequence(part, inputs) for part in parts)))):
+            yield reset_symbol + ".".join(parts)
+
+
+def iter_w_method_tests(fsm, states, inputs, reset_symbol, initial_state, order="length"):
+    """
+    W-method tests (RCIW) emitted one by one, without duplicate symbol sequences, see emit_tests.
+    """
+    covering_set = list(get_state_cover(fsm, initial_state, states, inputs))
+    w_set = sorted(get_characterizing_set(fsm, states, inputs), key=len)
+    streams = [_with_suffixes((c, i), w_set) for c in covering_set for i in inputs]
+    return emit_tests(streams, reset_symbol, inputs, order)
+
+
+def iter_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, order="length"):
+    """
+    Wp-method tests (RCW + RCIWs) emitted one by one, without duplicate symbol sequences, see emit_tests.
+    """
+    state_cover = get_state_cover(fsm, initial_state, states, inputs)
+    w_set = sorted(get_characterizing_set(fsm, states, inputs), key=len)
+    w_sets_per_state = {state: sorted(w, key=len) for state, w in get_identifying_sets(fsm, states, inputs).items()}
+    streams = []
+    for c, s in state_cover.items():
+        streams.append(_with_suffixes((c,), w_set))
+        for i in inputs:
+            streams.append(_with_suffixes((c, i), w_sets_per_state[fsm[s][i][0]]))
+    return emit_tests(streams, reset_symbol, inputs, order)
+
+
+def write_tests_jsonl(tests, path):
+    """
+    Write tests to a JSON Lines file as they are produced, one JSON string per line, see write_json_lines.
+    :return: The number of written tests.
+    """
+    return write_json_lines(tests, path)
+
+
+def write_tests_binary(tests, path, inputs, reset_symbol):
+    """
+    Write tests as they are produced in a compact binary form: every test is a 4-byte little-endian number
+    of symbols followed by symbol ids (1 byte each, 2 bytes with more than 256 symbols). Id 0 is the reset
+    symbol, the inputs follow in order; the symbol table is written to path + '.json'. Writes are buffered
+    by the file object.
+    :return: The number of written tests.
+    """
+    symbols = [reset_symbol] + list(inputs)
+    typecode = "B" if len(symbols) <= 1 << 8 else "H"
+    ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+    with open(path + ".json", "w", encoding="utf-8") as file:
+        json.dump({"symbols": symbols, "typecode": typecode}, file, ensure_ascii=False)
+
+    count = 0
+    with open(path, "wb") as file:
+        for test in tests:
+            data = array(typecode, [ids[token] for token in tokenize_test(test, inputs, reset_symbol)])
+            if sys.byteorder != "little":
+                data.byteswap()
+            file.write(len(data).to_bytes(4, "little") + data.tobytes())
+            count += 1
+    return count
+
+
+def read_tests_binary(path):
+    """
+    Read tests written by write_tests_binary.
+    :return: An iterator over the tests as lists of symbols.
+    """
+    with open(path + ".json", encoding="utf-8") as file:
+        table = json.load(file)
+    symbols, typecode = table["symbols"], table["typecode"]
+
+    with open(path, "rb") as file:
+        while header := file.read(4):
+            data = array(typecode)
+            data.frombytes(file.read(int.from_bytes(header, "little") * data.itemsize))
+            if sys.byteorder != "little":
+                data.byteswap()
+            yield [symbols[i] for i in data]
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    fsm = {
+        0: {'A': (0, 'X'), 'B': (1, 'Y')},
+        1: {'A': (2, 'Y'), 'B': (3, 'X')},
+        2: {'A': (3, 'X'), 'B': (0, 'X')},
+        3: {'A': (3, 'X'), 'B': (0, 'Y')},
+    }
+    states = list(fsm.keys())
+    inputs = ['A', 'B']
+    reset_symbol = 'R'
+    initial_state = 0
+
+    directory = tempfile.mkdtemp()
+    for name, write, args in [
+        ("wp_tests.jsonl", write_tests_jsonl, ()),
+        ("wp_tests.bin", write_tests_binary, (inputs, reset_symbol)),
+    ]:
+        path = os.path.join(directory, name)
+        count = write(iter_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state), path, *args)
+        print(f"{path}: {count} tests, {os.path.getsize(path)} bytes")
+    print("First tests read back:", ["".join(test) for test in read_tests_binary(path)][:5])
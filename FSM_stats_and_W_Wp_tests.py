@@ -1,6 +1,17 @@
+import hashlib
+import os
+import pickle
+import sys
+from collections import deque
 from itertools import product
 
+from FSM_compiled import CompiledFSM, compile_fsm
+
+ANALYSIS_VERSION = 3
+
 def fsm_transition(fsm, start_state, input_sequence):
+    if isinstance(fsm, CompiledFSM):
+        return fsm.transition(start_state, input_sequence)
     state = start_state
     output_sequence = []
     for inp in input_sequence:
@@ -10,19 +21,70 @@ def fsm_transition(fsm, start_state, input_sequence):
     return state, output_sequence
 
 def fsm_transition_for_covering(fsm, start_state, input_sequence):
+    if isinstance(fsm, CompiledFSM):
+        return fsm.transition(start_state, input_sequence)[0]
     state = start_state
     for inp in input_sequence:
         next_state, _ = fsm[state][inp]
         state = next_state
     return state
 
+# Input sequences are written as strings: symbols are concatenated when every input is one character, otherwise
+# they are joined with the "." that separates the parts of a test, so a sequence always splits back into its inputs.
+def sequence_separator(inputs):
+    return "" if all(len(inp) == 1 for inp in inputs) else "."
+
+def join_sequence(symbols, inputs):
+    return sequence_separator(inputs).join(symbols)
+
+def tokenize_sequence(sequence, inputs):
+    if not sequence:
+        return ()
+    if not sequence_separator(inputs):
+        return tuple(sequence)
+    tokens = tuple(sequence.split("."))
+    for token in tokens:
+        if token not in inputs:
+            raise ValueError(f"Unknown input symbol '{token}' in '{sequence}'")
+    return tokens
+
 def generate_input_sequences(inputs, max_length):
     sequences = []
     for length in range(1, max_length + 1):
         sequences.extend(product(inputs, repeat=length))
     return sequences
 
+# Lazy breadth-first walk over the trie of input sequences up to max_length, run from all start states at once.
+# Every node carries the vector of current states and a vector of response classes (start states with equal
+# classes gave equal outputs so far), both built from the parent's vectors, so a node costs O(n).
+def explore_input_trie(fsm, start_states, inputs, max_length):
+    fsm = compile_fsm(fsm, inputs)
+    queue = deque([((), [fsm.state_ids[state] for state in start_states], [0] * len(start_states))])
+    while queue:
+        seq, current, classes = queue.popleft()
+        if len(seq) == max_length:
+            continue
+        for inp in inputs:
+            next_states, outputs = fsm.step(current, fsm.input_ids[inp])
+            interned = {}
+            next_classes = [interned.setdefault(response, len(interned)) for response in zip(classes, outputs)]
+            node = (seq + (inp,), next_states, next_classes)
+            yield node
+            queue.append(node)
+
 def distinguish_state(fsm, states, target_state, input_sequences):
+    if isinstance(fsm, CompiledFSM):
+        remaining = [state for state in states if state != target_state]
+        w_set = set()
+        for seq in input_sequences:
+            if not remaining:
+                break
+            responses = fsm.responses([fsm.state_ids[state] for state in [target_state] + remaining], seq)
+            undistinguished = [state for state, response in zip(remaining, responses[1:]) if response == responses[0]]
+            if len(undistinguished) < len(remaining):
+                w_set.add("".join(seq))
+            remaining = undistinguished
+        return w_set
     w_set = set()
     for other_state in states:
         if other_state == target_state:
@@ -36,6 +98,23 @@ def distinguish_state(fsm, states, target_state, input_sequences):
     return w_set
 
 def distinguish_states(fsm, states, input_sequences):
+    if isinstance(fsm, CompiledFSM):
+        pairs = [(p, q) for p in states for q in states if p < q]
+        first = {}
+        remaining = pairs
+        ids = [fsm.state_ids[state] for state in states]
+        for seq in input_sequences:
+            if not remaining:
+                break
+            response = dict(zip(states, fsm.responses(ids, seq)))
+            undistinguished = []
+            for p, q in remaining:
+                if response[p] != response[q]:
+                    first[(p, q)] = ["".join(seq)]
+                else:
+                    undistinguished.append((p, q))
+            remaining = undistinguished
+        return {pair: first[pair] for pair in pairs if pair in first}
     distinguishable = {}
     for p in states:
         for q in states:
@@ -48,7 +127,174 @@ def distinguish_states(fsm, states, input_sequences):
                         break
     return distinguishable
 
+# Splitting tree of Moore-style partition refinement: round k splits blocks of states equivalent under
+# sequences of length < k, every inner node keeps one witness sequence whose outputs separate all of its
+# children, so the witness of the lowest common ancestor of two leaves is a shortest separating sequence.
+# Round k only revisits blocks with a successor in a block split in round k - 1. States are compiled to integer ids.
+# This is not Hopcroft's "process the smaller half" refinement: rounds are what keeps every witness shortest, and
+# they cost O(|I|·n) each, so the tree is built in O(|I|·n·d) for d rounds, O(|I|·n²) in the worst case.
+# The tree is built over the states and all states reachable from them; characterizing and identifying sets only
+# keep the witnesses of the lowest common ancestors of pairs of the given states.
+class SplittingTree:
+    def __init__(self, fsm, states, inputs):
+        self.fsm = compile_fsm(fsm, inputs)
+        self.inputs = list(inputs)
+        columns = [(self.fsm.next_columns[self.fsm.input_ids[inp]], self.fsm.output_columns[self.fsm.input_ids[inp]])
+                   for inp in self.inputs]
+        self.state_ids = self._state_ids(states)
+        ids = self._closure(self.state_ids)
+        self.parent = [None]
+        self.depth = [0]
+        self.witness = [None]
+        self.leaf = dict.fromkeys(ids, 0)
+        self.members = {0: ids}
+        predecessors = {s: [] for s in ids}
+        for s in ids:
+            for next_column, _ in columns:
+                predecessors[next_column[s]].append(s)
+        touched = {0}
+        while touched:
+            snapshot = dict(self.leaf)
+            split = []
+            for node in touched:
+                members = self.members[node]
+                groups = {}
+                for s in members:
+                    signature = tuple((output_column[s], snapshot[next_column[s]]) for next_column, output_column in columns)
+                    groups.setdefault(signature, []).append(s)
+                if len(groups) > 1:
+                    self._split(node, list(groups.values()), snapshot)
+                    split.extend(members)
+            touched = {self.leaf[p] for s in split for p in predecessors[s] if len(self.members[self.leaf[p]]) > 1}
+        self.separating_nodes = self._separating_nodes(self.state_ids)
+
+    def _state_ids(self, states):
+        unknown = [state for state in states if state not in self.fsm.state_ids]
+        if unknown:
+            raise ValueError(f"Unknown states: {unknown}")
+        return [self.fsm.state_ids[state] for state in states]
+
+    def _closure(self, ids):
+        # the states followed by the states reachable from them, in order of discovery
+        closure = list(dict.fromkeys(ids))
+        seen = set(closure)
+        columns = [self.fsm.next_columns[self.fsm.input_ids[inp]] for inp in self.inputs]
+        for s in closure:
+            for column in columns:
+                if column[s] not in seen:
+                    seen.add(column[s])
+                    closure.append(column[s])
+        return closure
+
+    def _separating_nodes(self, ids):
+        # inner nodes with the leaves of the states under at least two of their children,
+        # that is the lowest common ancestors of pairs of the states
+        marked = set()
+        branches = {}
+        for s in ids:
+            node = self.leaf[s]
+            while node not in marked:
+                marked.add(node)
+                parent = self.parent[node]
+                if parent is None:
+                    break
+                branches[parent] = branches.get(parent, 0) + 1
+                node = parent
+        return {node for node, count in branches.items() if count > 1}
+
+    def _new_node(self, parent):
+        self.parent.append(parent)
+        self.depth.append(self.depth[parent] + 1)
+        self.witness.append(None)
+        return len(self.parent) - 1
+
+    def _split(self, node, groups, snapshot):
+        # groups are blocks of the new partition inside the leaf node, states of a group answer alike
+        stack = [(node, groups)]
+        del self.members[node]
+        while stack:
+            node, groups = stack.pop()
+            if len(groups) == 1:
+                self.members[node] = groups[0]
+                for state in groups[0]:
+                    self.leaf[state] = node
+                continue
+            for inp in self.inputs:
+                next_column = self.fsm.next_columns[self.fsm.input_ids[inp]]
+                output_column = self.fsm.output_columns[self.fsm.input_ids[inp]]
+                if len({output_column[group[0]] for group in groups}) > 1:
+                    self.witness[node] = (inp,)
+                    key = output_column.__getitem__
+                    break
+                successors = {snapshot[next_column[group[0]]] for group in groups}
+                if len(successors) > 1:
+                    ancestor = self.lca(successors)
+                    self.witness[node] = (inp,) + self.witness[ancestor]
+                    key = lambda s, next_column=next_column, ancestor=ancestor: self.child_towards(ancestor, snapshot[next_column[s]])
+                    break
+            parts = {}
+            for group in groups:
+                parts.setdefault(key(group[0]), []).append(group)
+            for part in parts.values():
+                stack.append((self._new_node(node), part))
+
+    def lca(self, nodes):
+        nodes = iter(nodes)
+        ancestor = next(nodes)
+        for node in nodes:
+            while self.depth[node] > self.depth[ancestor]:
+                node = self.parent[node]
+            while self.depth[ancestor] > self.depth[node]:
+                ancestor = self.parent[ancestor]
+            while node != ancestor:
+                node, ancestor = self.parent[node], self.parent[ancestor]
+        return ancestor
+
+    def child_towards(self, ancestor, node):
+        while self.parent[node] != ancestor:
+            node = self.parent[node]
+        return node
+
+    def separating_witness(self, p, q):
+        p, q = self.fsm.state_ids[p], self.fsm.state_ids[q]
+        if self.leaf[p] == self.leaf[q]:
+            return None
+        return self.witness[self.lca((self.leaf[p], self.leaf[q]))]
+
+    def separating_sequence(self, p, q):
+        witness = self.separating_witness(p, q)
+        return None if witness is None else join_sequence(witness, self.inputs)
+
+    def characterizing_set(self):
+        return {join_sequence(self.witness[node], self.inputs) for node in self.separating_nodes}
+
+    def identifying_set(self, state):
+        w_set = set()
+        node = self.parent[self.leaf[self.fsm.state_ids[state]]]
+        while node is not None:
+            if node in self.separating_nodes:
+                w_set.add(join_sequence(self.witness[node], self.inputs))
+            node = self.parent[node]
+        return w_set
+
+def get_separating_sequences(fsm, states, inputs):
+    tree = SplittingTree(fsm, states, inputs)
+    separating = {}
+    for p in states:
+        for q in states:
+            if p < q:
+                sequence = tree.separating_sequence(p, q)
+                if sequence is not None:
+                    separating[(p, q)] = sequence
+    return separating
+
 def find_distinguishing_sequence(fsm, states, input_sequences):
+    if isinstance(fsm, CompiledFSM):
+        ids = [fsm.state_ids[state] for state in states]
+        for seq in input_sequences:
+            if len(set(fsm.responses(ids, seq))) == len(ids):
+                return "".join(seq)
+        return None
     for seq in input_sequences:
         outputs = {}
         is_distinguishing = True
@@ -63,44 +309,132 @@ def find_distinguishing_sequence(fsm, states, input_sequences):
             return "".join(seq)
     return None
 
+# Breadth-first spanning tree from the initial state: every state gets the shortest (then first in input order)
+# non-empty input sequence reaching it, each transition is followed once.
 def get_state_cover(fsm, initial_state, states, inputs):
-    input_sequences = generate_input_sequences(inputs, max_length=len(states))
+    compiled = compile_fsm(fsm, inputs)
+    columns = [compiled.next_columns[compiled.input_ids[inp]] for inp in inputs]
     state_cover = {}
-    for seq in input_sequences:
-        reached_state = fsm_transition_for_covering(fsm, initial_state, seq)
-        if reached_state not in state_cover.values():
-            state_cover["".join(seq)] = reached_state
-        if len(state_cover) == len(states):
-            break
+    visited = set()
+    queue = deque([((), compiled.state_ids[initial_state])])
+    while queue and len(visited) < len(states):
+        seq, s = queue.popleft()
+        for inp, column in zip(inputs, columns):
+            reached = column[s]
+            if reached not in visited:
+                visited.add(reached)
+                state_cover[join_sequence(seq + (inp,), inputs)] = compiled.states[reached]
+                queue.append((seq + (inp,), reached))
     return state_cover
 
+def get_transition_cover(fsm, initial_state, states, inputs):
+    state_cover = get_state_cover(fsm, initial_state, states, inputs)
+    transition_cover = {"": initial_state}
+    transition_cover.update(state_cover)
+    for c, s in [("", initial_state)] + list(state_cover.items()):
+        for inp in inputs:
+            transition_cover.setdefault(join_sequence(filter(None, (c, inp)), inputs), fsm[s][inp][0])
+    return transition_cover
+
 def get_distinguishing_sequence(fsm, states, inputs):
-    input_sequences = generate_input_sequences(inputs, max_length=4)
-    distinguishing_sequence = find_distinguishing_sequence(fsm, states, input_sequences)
-    return distinguishing_sequence
+    for seq, _, classes in explore_input_trie(fsm, states, inputs, 4):
+        if len(set(classes)) == len(states):
+            return join_sequence(seq, inputs)
+    return None
 
 def get_characterizing_set(fsm, states, inputs):
-    input_sequences = generate_input_sequences(inputs, max_length=4)
-    distinguishable = distinguish_states(fsm, states, input_sequences)
-    w_set_fsm = set()
-    for pair, seqs in distinguishable.items():
-        w_set_fsm.update(seqs)
-    return w_set_fsm
+    return SplittingTree(fsm, states, inputs).characterizing_set()
 
 def get_identifying_sets(fsm, states, inputs):
-    input_sequences = generate_input_sequences(inputs, max_length=4)
-    w_sets_per_state = {}
+    tree = SplittingTree(fsm, states, inputs)
+    return {state: tree.identifying_set(state) for state in states}
+
+def fsm_hash(fsm, states, inputs, initial_state):
+    digest = hashlib.sha256(repr((ANALYSIS_VERSION, list(states), list(inputs), initial_state)).encode())
     for state in states:
-        w_set = distinguish_state(fsm, states, state, input_sequences)
-        w_sets_per_state[state] = w_set
-    return w_sets_per_state
+        digest.update(repr([fsm[state][inp] for inp in inputs]).encode())
+    return digest.hexdigest()
 
-def print_fsm_stats(fsm, states, inputs, initial_state):
-    state_cover = get_state_cover(fsm, initial_state, states, inputs)
-    covering_set = list(state_cover.keys())
-    distinguishing_sequence = get_distinguishing_sequence(fsm, states, inputs)
-    w_set_fsm = get_characterizing_set(fsm, states, inputs)
-    w_sets_per_state = get_identifying_sets(fsm, states, inputs)
+# Lazily computed and memoized analysis artifacts of one FSM, the splitting tree included. With a cache directory the
+# artifacts are loaded from <cache_dir>/<content hash>.pickle, so runs on an unchanged machine do not recompute them;
+# save() stores the artifacts computed so far. A cache file of another format version or one that cannot be loaded
+# is ignored and recomputed.
+class FSMAnalysis:
+    ARTIFACTS = {
+        "tree": lambda analysis: SplittingTree(analysis.fsm, analysis.states, analysis.inputs),
+        "state_cover": lambda analysis: get_state_cover(analysis.fsm, analysis.initial_state, analysis.states, analysis.inputs),
+        "transition_cover": lambda analysis: get_transition_cover(analysis.fsm, analysis.initial_state, analysis.states, analysis.inputs),
+        "distinguishing_sequence": lambda analysis: get_distinguishing_sequence(analysis.fsm, analysis.states, analysis.inputs),
+        "characterizing_set": lambda analysis: analysis.tree.characterizing_set(),
+        "identifying_sets": lambda analysis: {state: analysis.tree.identifying_set(state) for state in analysis.states},
+    }
+
+    def __init__(self, fsm, states, inputs, initial_state, cache_dir=None):
+        self.fsm = fsm
+        self.states = list(states)
+        self.inputs = list(inputs)
+        self.initial_state = initial_state
+        self.key = fsm_hash(fsm, self.states, self.inputs, initial_state)
+        self.path = None if cache_dir is None else os.path.join(cache_dir, self.key + ".pickle")
+        self.artifacts = {}
+        self.changed = False
+        if self.path is not None and os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as file:
+                    version, artifacts = pickle.load(file)
+                if version == ANALYSIS_VERSION:
+                    self.artifacts = artifacts
+            except Exception:
+                self.artifacts = {}
+
+    @property
+    def tree(self):
+        return self.get("tree")
+
+    def get(self, name):
+        if name not in self.artifacts:
+            self.artifacts[name] = self.ARTIFACTS[name](self)
+            self.changed = True
+        return self.artifacts[name]
+
+    def save(self):
+        if self.path is None or not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "wb") as file:
+            pickle.dump((ANALYSIS_VERSION, self.artifacts), file)
+        os.replace(self.path + ".tmp", self.path)
+        self.changed = False
+
+    @property
+    def state_cover(self):
+        return self.get("state_cover")
+
+    @property
+    def transition_cover(self):
+        return self.get("transition_cover")
+
+    @property
+    def distinguishing_sequence(self):
+        return self.get("distinguishing_sequence")
+
+    @property
+    def characterizing_set(self):
+        return self.get("characterizing_set")
+
+    @property
+    def identifying_sets(self):
+        return self.get("identifying_sets")
+
+def get_analysis(fsm, states, inputs, initial_state, analysis=None):
+    return analysis if analysis is not None else FSMAnalysis(fsm, states, inputs, initial_state)
+
+def print_fsm_stats(fsm, states, inputs, initial_state, analysis=None):
+    analysis = get_analysis(fsm, states, inputs, initial_state, analysis)
+    covering_set = list(analysis.state_cover.keys())
+    distinguishing_sequence = analysis.distinguishing_sequence
+    w_set_fsm = analysis.characterizing_set
+    w_sets_per_state = analysis.identifying_sets
     print("1. Distinguishing sequence (d):", f"'{distinguishing_sequence}'")
     print("2. Characterizing set for the FSM (W):", w_set_fsm)
     print("3. Identifying sets for each state (Ws):")
@@ -109,19 +443,18 @@ def print_fsm_stats(fsm, states, inputs, initial_state):
     print("4. Covering set (C):", covering_set)
 
 def generate_rciw_tests(reset_symbol, covering_set, inputs, w_set):
-    input_sequences = generate_input_sequences(inputs, max_length=1)
     rciw_tests = []
     for c in covering_set:
-        for i in input_sequences:
+        for i in inputs:
             for w in w_set:
-                test_sequence = reset_symbol + ".".join([c, "".join(i), w])
+                test_sequence = reset_symbol + ".".join([c, i, w])
                 rciw_tests.append(test_sequence)
     return sorted(rciw_tests, key=len)
 
-def print_w_method_tests(fsm, states, inputs, reset_symbol, initial_state):
-    state_cover = get_state_cover(fsm, initial_state, states, inputs)
-    covering_set = list(state_cover.keys())
-    w_set = get_characterizing_set(fsm, states, inputs)
+def print_w_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    analysis = get_analysis(fsm, states, inputs, initial_state, analysis)
+    covering_set = list(analysis.state_cover.keys())
+    w_set = analysis.characterizing_set
     w_tests = generate_rciw_tests(reset_symbol, covering_set, inputs, w_set)
     print(f"5. W-method test (RCIW) [{len(w_tests)}]: {w_tests}")
 
@@ -135,50 +468,169 @@ def generate_rcw_tests(reset_symbol, covering_set, w_set):
 
 def generate_rciws_tests(fsm, state_cover, inputs, reset_symbol, w_sets_per_state):
     rciws_tests = set()
-    input_sequences = generate_input_sequences(inputs, max_length=1)
     for c, s in state_cover.items():
-        for i in input_sequences:
-            i_str = "".join(i)
+        for i_str in inputs:
             next_state, _ = fsm[s][i_str]
             for w in w_sets_per_state[next_state]:
                 test_sequence = reset_symbol + ".".join([c, i_str, w])
                 rciws_tests.add(test_sequence)
     return rciws_tests
 
-def generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state):
-    state_cover = get_state_cover(fsm, initial_state, states, inputs)
+def generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    analysis = get_analysis(fsm, states, inputs, initial_state, analysis)
+    state_cover = analysis.state_cover
     covering_set = list(state_cover.keys())
-    w_set = get_characterizing_set(fsm, states, inputs)
-    w_sets_per_state = get_identifying_sets(fsm, states, inputs)
+    w_set = analysis.characterizing_set
+    w_sets_per_state = analysis.identifying_sets
     rcw_tests = generate_rcw_tests(reset_symbol, covering_set, w_set)
     rciws_tests = generate_rciws_tests(fsm, state_cover, inputs, reset_symbol, w_sets_per_state)
     wp_tests = rcw_tests.union(rciws_tests)
     return sorted(set(wp_tests), key=len)
 
-def print_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state):
-    wp_tests = generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state)
+def print_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    wp_tests = generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
     print(f"6. Wp-method test (RCW + RCIWs) [{len(wp_tests)}]: {wp_tests}")
 
-def preprocess(s):
-    if s.startswith("R.") and len(s) > 2:
-        return "R" + s[2:]
-    return s
+# Set of symbol sequences stored as a trie of dicts, sequences sharing a prefix share its nodes.
+class SequenceTrie:
+    END = None
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def insert(self, symbols):
+        node = self.root
+        for symbol in symbols:
+            node = node.setdefault(symbol, {})
+        return node
 
-def is_prefix(small, large):
-    return large.startswith(small)
+    def add(self, symbols):
+        node = self.insert(symbols)
+        if self.END in node:
+            return False
+        node[self.END] = True
+        self.size += 1
+        return True
 
-def remove_prefixes(strings):
-    processed_strings = [preprocess(s) for s in strings]
+# A test is the reset symbol followed by input sequences joined with "." (see join_sequence), so it is split into
+# inputs on the separators; without inputs every character is taken as one input.
+def tokenize_test(test, inputs=None, reset_symbol="R"):
+    if not test.startswith(reset_symbol):
+        raise ValueError(f"Test '{test}' does not start with the reset symbol '{reset_symbol}'")
+    tokens = [reset_symbol]
+    for part in test[len(reset_symbol):].split("."):
+        tokens.extend(part if inputs is None else tokenize_sequence(part, inputs))
+    return tuple(tokens)
+
+# Drops tests whose symbols are a prefix of another test (and repeated tests) in one pass over a trie of all tests.
+# Returns the kept tests in their order and the number of symbols of all tests and of the kept ones.
+def minimize_tests(strings, inputs=None, reset_symbol="R"):
+    trie = SequenceTrie()
+    tokenized = [tokenize_test(s, inputs, reset_symbol) for s in strings]
+    nodes = [trie.insert(tokens) for tokens in tokenized]
     result = []
-    for i, s in enumerate(processed_strings):
-        if not any(is_prefix(s, other) for j, other in enumerate(processed_strings) if i != j):
-            result.append(strings[i])
-    return result
-
-def print_minimized_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state):
-    wp_tests = generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state)
-    minimized_wp_tests = remove_prefixes(wp_tests)
+    kept = set()
+    kept_length = 0
+    for s, tokens, node in zip(strings, tokenized, nodes):
+        if not node and id(node) not in kept:
+            kept.add(id(node))
+            kept_length += len(tokens)
+            result.append(s)
+    return result, sum(map(len, tokenized)), kept_length
+
+def remove_prefixes(strings, inputs=None, reset_symbol="R"):
+    return minimize_tests(strings, inputs, reset_symbol)[0]
+
+def print_minimized_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    wp_tests = generate_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    minimized_wp_tests, total_length, kept_length = minimize_tests(wp_tests, inputs, reset_symbol)
     print(f"7. Minimized Wp-method test (reduced subsequences) [{len(minimized_wp_tests)}]: {minimized_wp_tests}")
+    print(f"\tExecution length: {kept_length} of {total_length} symbols ({total_length - kept_length} saved)")
+
+# HSI-method: the identifying sets of the splitting tree are harmonized (the sets of two states share the witness
+# of their split), so they serve both after the state cover and after every transition; prefix tests are dropped.
+def generate_hsi_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    analysis = get_analysis(fsm, states, inputs, initial_state, analysis)
+    state_cover = analysis.state_cover
+    h_sets = analysis.identifying_sets
+    rch_tests = {reset_symbol + ".".join([c, h]) for c, s in state_cover.items() for h in h_sets[s]}
+    rcih_tests = generate_rciws_tests(fsm, state_cover, inputs, reset_symbol, h_sets)
+    return remove_prefixes(sorted(rch_tests | rcih_tests, key=len), inputs, reset_symbol)
+
+# First divergence of two states run along the paths of a trie node (only paths present in other, if given).
+def find_separating_path(fsm, node, p, q, other=None):
+    stack = [(node, other, p, q, ())]
+    while stack:
+        node, other, p, q, path = stack.pop()
+        for symbol, child in node.items():
+            if symbol is SequenceTrie.END or (other is not None and symbol not in other):
+                continue
+            i = fsm.input_ids[symbol]
+            if fsm.output_columns[i][p] != fsm.output_columns[i][q]:
+                return path + (symbol,)
+            stack.append((child, None if other is None else other[symbol], fsm.next_columns[i][p], fsm.next_columns[i][q], path + (symbol,)))
+    return None
+
+def count_missing(node, symbols):
+    for k, symbol in enumerate(symbols):
+        if symbol not in node:
+            return len(symbols) - k
+        node = node[symbol]
+    return 0
+
+# H-method: the state cover and the transition cover are kept in a trie, every pair of a state cover sequence and
+# a state or transition cover sequence reaching different states must be followed by a common separating suffix.
+# Pairs already separated by the trie are skipped, otherwise the cheapest suffix among the separating witness and
+# separating paths already in the trie after either sequence is added. Tests are the leaves of the trie, written
+# as the reset symbol followed by their inputs joined with ".".
+def generate_h_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    analysis = get_analysis(fsm, states, inputs, initial_state, analysis)
+    tree = analysis.tree
+    compiled = tree.fsm
+    state_cover = analysis.state_cover
+    access = [(tokenize_sequence(c, inputs), compiled.state_ids[s]) for c, s in state_cover.items()]
+    transitions = [
+        (c + (i,), compiled.next_columns[compiled.input_ids[i]][s]) for c, s in access for i in inputs
+    ]
+    trie = SequenceTrie()
+    for sequence, _ in transitions:
+        trie.insert(sequence)
+
+    for k, (alpha, p) in enumerate(access):
+        for beta, q in access[k + 1:] + transitions:
+            if p == q:
+                continue
+            witness = tree.separating_witness(compiled.states[p], compiled.states[q])
+            if witness is None:
+                continue
+            alpha_node, beta_node = trie.insert(alpha), trie.insert(beta)
+            if find_separating_path(compiled, alpha_node, p, q, beta_node) is not None:
+                continue
+            candidates = [witness]
+            for path in (find_separating_path(compiled, alpha_node, p, q), find_separating_path(compiled, beta_node, q, p)):
+                if path is not None:
+                    candidates.append(path)
+            suffix = min(candidates, key=lambda gamma: (count_missing(alpha_node, gamma) + count_missing(beta_node, gamma), len(gamma)))
+            trie.insert(alpha + suffix)
+            trie.insert(beta + suffix)
+
+    h_tests = []
+    stack = [(trie.root, ())]
+    while stack:
+        node, path = stack.pop()
+        if not node:
+            h_tests.append(reset_symbol + ".".join(path))
+        stack.extend((child, path + (symbol,)) for symbol, child in node.items())
+    return sorted(h_tests, key=len)
+
+def print_hsi_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    hsi_tests = generate_hsi_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print(f"8. HSI-method test [{len(hsi_tests)}]: {hsi_tests}")
+
+def print_h_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis=None):
+    h_tests = generate_h_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print(f"9. H-method test [{len(h_tests)}]: {h_tests}")
 
 if __name__ == "__main__":
     fsm = {
@@ -191,8 +643,12 @@ if __name__ == "__main__":
     inputs = ['A', 'B']
     reset_symbol = 'R'
     initial_state = 0
+    analysis = FSMAnalysis(fsm, states, inputs, initial_state, cache_dir=sys.argv[1] if len(sys.argv) > 1 else None)
 
-    print_fsm_stats(fsm, states, inputs, initial_state)
-    print_w_method_tests(fsm, states, inputs, reset_symbol, initial_state)
-    print_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state)
-    print_minimized_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state)
\ No newline at end of file
+    print_fsm_stats(fsm, states, inputs, initial_state, analysis)
+    print_w_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print_minimized_wp_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print_hsi_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    print_h_method_tests(fsm, states, inputs, reset_symbol, initial_state, analysis)
+    analysis.save()
\ No newline at end of file
@@ -1,4 +1,8 @@
+import mmap
+import os
 import struct
+import sys
+from array import array
 
 def clean_binary_input(binary_str):
     return binary_str.replace(" ", "")
@@ -21,6 +25,118 @@ def ieee754_to_float(binary_str):
     packed = bytes(byte_array)
     return struct.unpack('>f', packed)[0]
     
+def float32_words(values):
+    """
+    Reinterprets binary32 values as unsigned 32-bit words in native byte order.
+    A contiguous buffer of floats (array('f'), a NumPy float32 array, any buffer with format 'f') is viewed
+    without copying, other iterables of numbers are packed into an array('f') first; values too large for binary32
+    become infinities (float_to_ieee754 raises OverflowError for them).
+    """
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is None or view.format != 'f' or not view.c_contiguous:
+        view = memoryview(array('f', values))
+    return view.cast('B').cast('I')
+
+def _big_endian_bytes(words):
+    if sys.byteorder == 'big':
+        return words.tobytes()
+    swapped = array('I', words)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def floats_to_ieee754_bits(values):
+    """
+    Converts floating-point values to one packed bit string: 32 ASCII '0'/'1' bytes per value, value i at [32 * i, 32 * i + 32).
+    All values are formatted at once as the bits of a single integer.
+    """
+    data = _big_endian_bytes(float32_words(values))
+    if not data:
+        return b''
+    return format(int.from_bytes(data, 'big'), f'0{8 * len(data)}b').encode('ascii')
+
+def floats_to_ieee754(values):
+    """
+    Converts floating-point values to a list of IEEE 754 binary32 strings, as float_to_ieee754 does one by one.
+    """
+    bits = floats_to_ieee754_bits(values).decode('ascii')
+    return [bits[i:i + 32] for i in range(0, len(bits), 32)]
+
+_SIGN = bytes(byte >> 7 for byte in range(256))
+_EXPONENT_HIGH = bytes((byte & 0x7f) << 1 for byte in range(256))
+_EXPONENT_LOW = bytes(byte >> 7 for byte in range(256))
+
+def floats_to_ieee754_fields(values):
+    """
+    Splits binary32 values into sign, biased exponent and mantissa arrays (array('B'), array('B'), array('I')).
+    Fields are cut from strided byte slices and masks of the whole buffer, not value by value.
+    """
+    data = _big_endian_bytes(float32_words(values))
+    n = len(data) // 4
+    sign = array('B', data[0::4].translate(_SIGN))
+    exponent = array('B', (
+        int.from_bytes(data[0::4].translate(_EXPONENT_HIGH), 'big') | int.from_bytes(data[1::4].translate(_EXPONENT_LOW), 'big')
+    ).to_bytes(n, 'big'))
+    mantissa = array('I')
+    mantissa.frombytes((int.from_bytes(data, 'big') & int.from_bytes(b'\x00\x7f\xff\xff' * n, 'big')).to_bytes(4 * n, 'big'))
+    if sys.byteorder != 'big':
+        mantissa.byteswap()
+    return sign, exponent, mantissa
+
+def ieee754_bits_to_floats(bits):
+    """
+    Converts a packed bit string (bytes or str of '0'/'1', 32 per value, no separators) to an array('f').
+    """
+    if isinstance(bits, str):
+        bits = bits.encode('ascii')
+    if len(bits) % 32 or bytes(bits).translate(None, b'01'):
+        raise ValueError("Expected a string of '0' and '1' with 32 digits per value")
+    floats = array('f')
+    if bits:
+        floats.frombytes(int(bits, 2).to_bytes(len(bits) // 8, 'big'))
+        if sys.byteorder != 'big':
+            floats.byteswap()
+    return floats
+
+def ieee754_to_floats(binary_strs):
+    """
+    Converts IEEE 754 binary32 strings (spaces allowed, as in ieee754_to_float) to an array('f').
+    """
+    return ieee754_bits_to_floats(clean_binary_input(''.join(binary_strs)))
+
+def write_ieee754_file(values, path, packed=False):
+    """
+    Writes the binary32 strings of values to a file, one per line, or without separators if packed.
+    """
+    bits = floats_to_ieee754_bits(values)
+    with open(path, 'wb') as file:
+        if packed:
+            file.write(bits)
+        else:
+            file.writelines(bits[i:i + 32] + b'\n' for i in range(0, len(bits), 32))
+
+def read_ieee754_file(path, chunk_size=1 << 20):
+    """
+    Reads a file of binary32 strings (one per line with optional spaces, or packed without separators)
+    through a memory map, about chunk_size bytes at a time, cut at line ends.
+    Returns an array('f').
+    """
+    floats = array('f')
+    if os.path.getsize(path) == 0:
+        return floats
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        while start < len(mapped):
+            end = min(start + chunk_size, len(mapped))
+            if end < len(mapped):
+                newline = mapped.find(b'\n', end - 1)
+                end = len(mapped) if newline == -1 else newline + 1
+            floats.extend(ieee754_bits_to_floats(mapped[start:end].translate(None, b' \t\r\n')))
+            start = end
+    return floats
+    
 def print_float_to_ieee754(float_inputs):
     for i, value in enumerate(float_inputs):
         ieee754_binary = float_to_ieee754(value)
@@ -52,6 +168,24 @@ def print_matches(float_inputs, binary_inputs):
             print("  No Matches Found.\n")
     print("---------------------------------------------------------")        
 
+def describe_exponent(exponent, mantissa):
+    """
+    Meaning of a biased binary32 exponent: the unbiased exponent, or the special value it encodes.
+    Exponent 0 holds zeros and subnormals (effective exponent -126), exponent 255 infinities and NaNs.
+    """
+    if exponent == 0:
+        return "zero" if mantissa == 0 else "subnormal, -126"
+    if exponent == 255:
+        return "infinity" if mantissa == 0 else "NaN"
+    return f"{exponent - 127:+d}"
+
+def print_ieee754_fields(float_inputs):
+    signs, exponents, mantissas = floats_to_ieee754_fields(float_inputs)
+    for i, (value, sign, exponent, mantissa) in enumerate(zip(float_inputs, signs, exponents, mantissas)):
+        print(f"Float Input {i + 1}: {value}")
+        print(f"  Sign: {sign}, Exponent: {exponent:08b} ({describe_exponent(exponent, mantissa)}), Mantissa: {mantissa:023b}\n")
+    print("---------------------------------------------------------")
+
 
 if __name__ == "__main__":
     # Float inputs to convert to IEEE 754
@@ -73,4 +207,4 @@ if __name__ == "__main__":
     ]
 
     print_matches(float_inputs, binary_inputs)
-
+    print_ieee754_fields(float_inputs)
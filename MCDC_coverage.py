@@ -1,6 +1,7 @@
 import re
 from typing import List
-from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
 
 
 class Condition:
@@ -68,42 +69,70 @@ class Condition:
         return True
 
 
+class CompiledBranch:
+    # Branch in disjunctive normal form over condition indexes: '&&' binds tighter than '||', every term is a pair
+    # of masks of conditions that must be true and must be false, so a branch is evaluated on a bit vector of
+    # condition values (bit j is condition j) without parsing.
+    def __init__(self, terms, literals):
+        self.terms = terms
+        self.literals = literals
+
+    def __call__(self, bits):
+        for true_mask, false_mask in self.terms:
+            if bits & true_mask == true_mask and not bits & false_mask:
+                return True
+
+        return False
+
+
 class Branch:
     def __init__(self, value):
         self.value = value
         self.conditions = [Condition(condition) for condition in re.split(r'\|\||&&', value)]
+        self.operators = re.findall(r'\|\||&&', value)
+        self.compiled = {}
 
-    def evaluate(self, filtered_conditions, is_debug=False):
-        lexemes = re.findall(r'\|\||&&|(?:\w+ (?:<=|>=|<|>|==|!=) -?\d+(?:\.\d+)?)', self.value)
-        expression = []
+    def compile(self, filtered_conditions):
+        # Keyed by condition text: matching depends only on it, and ids of freed condition lists can be reused
+        key = tuple(str(condition) for condition in filtered_conditions)
 
-        for i, lexeme in enumerate(lexemes):
-            if lexeme == '||':
-                expression.append('or')
-                continue
+        if key not in self.compiled:
+            terms = [[0, 0]]
+            literals = []
 
-            if lexeme == '&&':
-                expression.append('and')
-                continue
+            for condition, operator in zip(self.conditions, self.operators + ['']):
+                index = 0
+
+                while index < len(filtered_conditions) and not (condition == filtered_conditions[index]) and not condition.is_inverse(filtered_conditions[index]):
+                    index += 1
 
-            condition = Condition(lexeme)
-            index = 0
+                assert index < len(filtered_conditions)
 
-            while index < len(filtered_conditions) and not (condition == filtered_conditions[index]) and not condition.is_inverse(filtered_conditions[index]):
-                index += 1
+                is_inverse = condition.is_inverse(filtered_conditions[index])
+                terms[-1][1 if is_inverse else 0] |= 1 << index
+                literals.append((index, is_inverse))
 
-            assert index < len(filtered_conditions)
+                if operator == '||':
+                    terms.append([0, 0])
 
-            if condition.is_inverse(filtered_conditions[index]):
-                expression.append(str(not filtered_conditions[index].is_true))
-            else:
-                expression.append(str(filtered_conditions[index].is_true))
+            self.compiled[key] = CompiledBranch([tuple(term) for term in terms], literals)
 
-        expression = ' '.join(expression)
-        result = eval(expression)
+        return self.compiled[key]
+
+    def evaluate(self, filtered_conditions, is_debug=False):
+        bits = sum(1 << j for j, condition in enumerate(filtered_conditions) if condition.is_true)
+        compiled = self.compile(filtered_conditions)
+        result = compiled(bits)
 
         if is_debug:
-            print(' '.join(lexemes), '=', expression, '=', result)
+            lexemes = [str(self.conditions[0])]
+            expression = [str(bool(bits >> compiled.literals[0][0] & 1) != compiled.literals[0][1])]
+
+            for condition, operator, (index, is_inverse) in zip(self.conditions[1:], self.operators, compiled.literals[1:]):
+                lexemes += [operator, str(condition)]
+                expression += [{'||': 'or', '&&': 'and'}[operator], str(bool(bits >> index & 1) != is_inverse)]
+
+            print(' '.join(lexemes), '=', ' '.join(expression), '=', result)
 
         return result
 
@@ -142,52 +171,164 @@ def is_exists(conditions):
     return True
 
 
-def make_table(conditions, branches):
-    print('Table of conditions and branches:\n\t', '|     № |' + ''.join(['%6s |' % condition for condition in conditions]) + ''.join('%6s |' % ['I', 'II', 'III', 'IV'][i] for i in range(len(branches))))
+def infeasible_combinations(conditions):
+    # Pairs of conditions with the combinations of values that cannot hold together: the ones rejected by
+    # Condition.is_exists and equal values of inverse conditions.
+    infeasible_pairs = []
+
+    for a, b in combinations(range(len(conditions)), 2):
+        first, second = conditions[a], conditions[b]
+        saved = first.is_true, second.is_true
+        infeasible = []
+
+        for first_value, second_value in product([False, True], repeat=2):
+            first.set_true(first_value)
+            second.set_true(second_value)
+
+            if not first.is_exists(second) or (first.is_inverse(second) and first_value == second_value):
+                infeasible.append((first_value, second_value))
+
+        first.set_true(saved[0])
+        second.set_true(saved[1])
+
+        if infeasible:
+            infeasible_pairs.append((a, b, infeasible))
+
+    return infeasible_pairs
+
+
+def condition_column(j, start, size):
+    # Bit r of the result is the value of condition j in row start + r (row i sets condition j iff bit j of i is set),
+    # start is a multiple of size and size is a power of two.
+    if size <= 1 << j:
+        return (1 << size) - 1 if start >> j & 1 else 0
+
+    period = 1 << (j + 1)
+    pattern = ((1 << (1 << j)) - 1) << (1 << j)
+
+    return pattern * (((1 << size) - 1) // ((1 << period) - 1))
+
+
+def iter_truth_table(conditions, branches, chunk_bits=16):
+    # Truth table in chunks of 2^chunk_bits rows, every column is an integer with one bit per row: yields the first
+    # row of the chunk, the mask of feasible rows and the masks of rows where each branch is true.
     n = len(conditions)
-    pos = 0
+    size = 1 << min(n, chunk_bits)
+    full = (1 << size) - 1
+    infeasible = infeasible_combinations(conditions)
+    compiled = [branch.compile(conditions) for branch in branches]
+
+    for start in range(0, 1 << n, size):
+        columns = [condition_column(j, start, size) for j in range(n)]
+        feasible = full
+
+        for a, b, values in infeasible:
+            for first_value, second_value in values:
+                feasible &= ~((columns[a] if first_value else full ^ columns[a]) & (columns[b] if second_value else full ^ columns[b]))
+
+        branch_masks = []
+
+        for branch in compiled:
+            mask = 0
+
+            for true_mask, false_mask in branch.terms:
+                term = full
+
+                for j in range(n):
+                    if true_mask >> j & 1:
+                        term &= columns[j]
+
+                    if false_mask >> j & 1:
+                        term &= full ^ columns[j]
+
+                mask |= term
+
+            branch_masks.append(mask & feasible)
+
+        yield start, feasible, branch_masks
+
+
+def iter_truth_table_rows(conditions, branches, chunk_bits=16):
+    # Feasible rows one by one as (row bits, branch values), without keeping the table in memory.
+    for start, feasible, branch_masks in iter_truth_table(conditions, branches, chunk_bits):
+        bits = bin(feasible)[:1:-1]
+        branch_bits = [bin(mask)[:1:-1] for mask in branch_masks]
+        r = bits.find('1')
 
+        while r != -1:
+            yield start + r, [1 if r < len(column) and column[r] == '1' else 0 for column in branch_bits]
+            r = bits.find('1', r + 1)
+
+
+def truth_table(conditions, branches):
+    n = len(conditions)
     total_values = []
     total_branch_values = []
 
-    for i in range(1 << n):
-        values = [(i >> j) & 1 for j in range(n)]
+    for i, branch_values in iter_truth_table_rows(conditions, branches):
+        total_values.append([(i >> j) & 1 for j in range(n)])
+        total_branch_values.append(branch_values)
 
-        for j in range(n):
-            conditions[j].set_true(values[j] == 1)
+    return total_values, total_branch_values
 
-        if not is_exists(conditions):
-            continue
 
-        branch_values = [1 if branch.evaluate(conditions) else 0 for branch in branches]
-        total_values.append(values)
-        total_branch_values.append(branch_values)
-        pos += 1
+def print_truth_table(conditions, branch_count, values, branch_values):
+    print('Table of conditions and branches:\n\t', '|     № |' + ''.join(['%6s |' % condition for condition in conditions]) + ''.join('%6s |' % branch_label(i) for i in range(branch_count)))
 
-        print('\t', ('| %5d |' % pos) + ''.join(['%6s |' % value for value in values + branch_values]))
+    for pos, row in enumerate(values, 1):
+        print('\t', ('| %5d |' % pos) + ''.join(['%6s |' % value for value in row + branch_values[pos - 1]]))
     print('\n')
 
-    return total_values, total_branch_values
 
-def find_pairs_for_condition(values, branch_values, branch_index, index, indexes):
-    pairs = []
+def make_table(conditions, branches):
+    values, branch_values = truth_table(conditions, branches)
+    print_truth_table(conditions, len(branches), values, branch_values)
 
-    for i in range(len(values)):
-        for j in range(i + 1, len(values)):
-            vi = [values[i][ind] for ind in indexes]
-            vj = [values[j][ind] for ind in indexes]
-            pos = indexes.index(index)
+    return values, branch_values
 
-            if vi[pos] == vj[pos] or branch_values[i][branch_index] == branch_values[j][branch_index]:
-                continue
+MCDC_MODES = ('unique-cause', 'masking', 'unique-cause+masking')
+
+
+def find_pairs_for_condition(values, branch_values, branch_index, index, indexes, mode='unique-cause', coupled=()):
+    # Rows are grouped by the values of the conditions that must stay fixed and split by the value of the condition
+    # and the branch outcome, so only independence pairs are visited. Unique-cause keeps all other conditions of the
+    # branch fixed; masking lets them change as long as flipping the condition alone changes the outcome of both rows;
+    # unique-cause+masking lets only conditions coupled with it (over the same variable) change that way.
+    if mode not in MCDC_MODES:
+        raise ValueError(f'Unknown MC/DC mode: {mode}')
+
+    if mode == 'masking':
+        fixed = []
+    else:
+        fixed = [ind for ind in indexes if ind != index and (mode == 'unique-cause' or ind not in coupled)]
+
+    pos = indexes.index(index)
+    outcomes = {tuple(row[ind] for ind in indexes): branch_values[k][branch_index] for k, row in enumerate(values)}
 
-            vi[pos] = -1
-            vj[pos] = -1
+    def is_determinant(k):
+        flipped = [values[k][ind] for ind in indexes]
+        flipped[pos] ^= 1
+        other = outcomes.get(tuple(flipped))
+        return other is not None and other != branch_values[k][branch_index]
 
-            if vi == vj:
-                pairs.append((i, j))
+    groups = {}
+
+    for k, row in enumerate(values):
+        if mode != 'unique-cause' and not is_determinant(k):
+            continue
+
+        key = tuple(row[ind] for ind in fixed)
+        groups.setdefault(key, {}).setdefault((row[index], branch_values[k][branch_index]), []).append(k)
+
+    pairs = []
 
-    return pairs
+    for group in groups.values():
+        for outcome in (0, 1):
+            for i in group.get((0, outcome), []):
+                for j in group.get((1, 1 - outcome), []):
+                    pairs.append((min(i, j), max(i, j)))
+
+    return sorted(pairs)
 
 
 def print_table(columns, column_names):
@@ -208,85 +349,332 @@ def transpose(v):
     return vv
 
 
-def find_pairs(conditions, branches, values, branch_values):
-    m = len(values)
+def branch_label(index):
+    number = index + 1
+    label = ''
+
+    for value, numeral in [(1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+                           (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]:
+        while number >= value:
+            label += numeral
+            number -= value
+
+    return label
+
+
+def pair_rows(pair):
+    return frozenset(row for row in pair if row > -1)
+
+
+def find_min_pairs_brute_force(requirements, m):
+    # Reference checker: tries every choice of one pair per requirement (exponential), the first smallest one wins.
+    min_sum = m
+    min_pairs = []
+
+    for choice in product(*requirements):
+        v = [0 for _ in range(m)]
+
+        for p in choice:
+            for row in pair_rows(p):
+                v[row] = 1
+
+        if sum(v) < min_sum:
+            min_sum = sum(v)
+            min_pairs = list(choice)
+
+    return min_pairs
+
+
+def select_pairs_greedy(requirements):
+    # Set-cover heuristic: repeatedly take the pair adding the fewest new rows (ties go to pairs whose rows
+    # appear in more candidate pairs of other requirements), requirements whose pair is already covered are done.
+    popularity = {}
+
+    for candidates in requirements:
+        for row in set().union(*(pair_rows(p) for p in candidates)):
+            popularity[row] = popularity.get(row, 0) + 1
+
+    rows = set()
+    chosen = [None] * len(requirements)
+
+    while None in chosen:
+        best = None
+
+        for k, candidates in enumerate(requirements):
+            if chosen[k] is not None:
+                continue
+
+            for p in candidates:
+                new_rows = pair_rows(p) - rows
+                score = (len(new_rows), -sum(popularity[row] for row in new_rows))
+
+                if best is None or score < best[0]:
+                    best = (score, k, p)
+
+        _, k, p = best
+        chosen[k] = p
+        rows |= pair_rows(p)
+
+        for k, candidates in enumerate(requirements):
+            if chosen[k] is None:
+                chosen[k] = next((p for p in candidates if pair_rows(p) <= rows), None)
+
+    return chosen
+
+
+def select_pairs(requirements, exact=True, max_nodes=20000):
+    # Chooses one independence pair for every requirement (a list of candidate pairs of two rows, [-1, -1] for none)
+    # so that the chosen pairs use the fewest rows. The greedy result is improved by branch and bound: requirements
+    # are taken in order and candidates in order, a partial choice is cut when its rows plus the largest number of
+    # rows some remaining requirement still needs cannot beat the best choice, so the first smallest choice in
+    # order is found (the same as find_min_pairs_brute_force). After max_nodes the best choice so far is returned.
+    # Returns the chosen pairs and whether the choice is proven to be minimal.
+    greedy = select_pairs_greedy(requirements)
+
+    if not exact:
+        return greedy, False
+
+    # Rows are bits of integers: the rows of every candidate, and per requirement the rows used by its candidates
+    # with, for every such row, the rows it is paired with.
+    masks = [[sum(1 << row for row in pair_rows(p)) for p in candidates] for candidates in requirements]
+    free = [any(not mask for mask in candidate_masks) for candidate_masks in masks]
+    partners = []
+
+    for candidates in requirements:
+        partner = {}
+
+        for p in candidates:
+            if len(pair_rows(p)) == 2:
+                i, j = p
+                partner[i] = partner.get(i, 0) | 1 << j
+                partner[j] = partner.get(j, 0) | 1 << i
+
+        partners.append(partner)
+
+    spans = [sum(1 << row for row in partner) for partner in partners]
+
+    def needed(k, rows):
+        # Fewest rows requirement k still needs.
+        if free[k]:
+            return 0
+
+        common = rows & spans[k]
+
+        if not common:
+            return 2
+
+        while common:
+            low = common & -common
+
+            if partners[k][low.bit_length() - 1] & rows:
+                return 0
+
+            common ^= low
+
+        return 1
+
+    best = [len(set().union(*(pair_rows(p) for p in greedy))) + 1, greedy]
+    nodes = 0
+    visited = set()
+    chosen = []
+
+    def search(depth, rows, size):
+        nonlocal nodes
+        nodes += 1
+
+        if nodes > max_nodes:
+            return False
+
+        if depth == len(requirements):
+            if size < best[0]:
+                best[:] = [size, list(chosen)]
+            return True
+
+        # The same rows reached again after the same requirements can only lead to later choices of the same size.
+        if (depth, rows) in visited:
+            return True
+
+        visited.add((depth, rows))
+        bound = 0
+
+        for k in range(depth, len(requirements)):
+            bound = max(bound, needed(k, rows))
+
+            if size + bound >= best[0]:
+                return True
+
+        # A candidate adding a superset of the new rows of an earlier one cannot give a better choice.
+        tried = set()
+
+        for p, mask in zip(requirements[depth], masks[depth]):
+            new_rows = mask & ~rows
+            low = new_rows & -new_rows
+
+            if new_rows in tried or low in tried or new_rows ^ low in tried:
+                continue
+
+            tried.add(new_rows)
+            chosen.append(p)
+            finished = search(depth + 1, rows | new_rows, size + bin(new_rows).count('1'))
+            chosen.pop()
+
+            if not finished:
+                return False
+
+            if not new_rows:
+                break
+
+        return True
+
+    finished = search(0, 0, 0)
+
+    return best[1], finished
+
+
+def find_branch_pairs(conditions, branches, values, branch_values, mode='unique-cause'):
+    # Candidate independence pairs of every condition of every branch ([[-1, -1]] if there are none).
     branches_pairs = []
 
     for index, branch in enumerate(branches):
-        branch_conditions = [condition for condition in conditions if condition in branch]
-        indexes = [conditions.index(condition) for condition in branch_conditions]
-        branch_pairs = []
+        indexes = [conditions.index(condition) for condition in conditions if condition in branch]
         branch_test_pairs = []
 
-        print(['I', 'II', 'III'][index] + ':', indexes)
         for i in indexes:
-            pairs = find_pairs_for_condition(values, branch_values, index, i, indexes)
+            coupled = [ind for ind in indexes if ind != i and conditions[ind].name == conditions[i].name]
+            branch_test_pairs.append(find_pairs_for_condition(values, branch_values, index, i, indexes, mode, coupled) or [[-1, -1]])
 
-            if not pairs:
-                pairs = [[-1, -1]]
+        branches_pairs.append((indexes, branch_test_pairs))
 
+    return branches_pairs
+
+
+def print_pairs(conditions, branches_pairs, values, branch_values, min_pairs, is_minimal=True):
+    m = len(values)
+    conditions = [str(c) for c in conditions]
+    columns = transpose(values)
+    branch_columns = transpose(branch_values)
+
+    for index, (indexes, branch_test_pairs) in enumerate(branches_pairs):
+        branch_pairs = []
+
+        print(branch_label(index) + ':', indexes)
+        for i, pairs in zip(indexes, branch_test_pairs):
             i1, i2 = pairs[0]
             pair = ['*' if j == i1 or j == i2 else ' ' for j in range(m)]
             branch_pairs.append(pair)
-            branch_test_pairs.append(pairs)
-            print(str(conditions[i]) + ':', [[i1 + 1, i2 + 1] for i1, i2 in pairs])
+            print(conditions[i] + ':', [[i1 + 1, i2 + 1] for i1, i2 in pairs])
 
-        branches_pairs.append(branch_test_pairs)
-        print_table(transpose(values) + [transpose(branch_values)[index]] + branch_pairs, [str(c) for c in conditions] + [['I', 'II', 'III'][index]] + [str(c) for c in branch_conditions])
+        print_table(columns + [branch_columns[index]] + branch_pairs, conditions + [branch_label(index)] + [conditions[i] for i in indexes])
         print('\n')
 
-    pairs1, pairs2 = branches_pairs
+    v = [' ' for _ in range(m)]
 
-    min_sum = m
-    min_pairs = []
+    for p in min_pairs:
+        for row in pair_rows(p):
+            v[row] = '*'
 
-    for pair1 in product(*pairs1):
-        for pair2 in product(*pairs2):
-            v = [0 for _ in range(m)]
+    print('Final table with chosen conditions for MC/DC coverage' + ('' if is_minimal else ' (not proven minimal)') + ':')
+    print_table(columns + branch_columns + [v], conditions + [branch_label(i) for i in range(len(branches_pairs))] + ['MC/DC'])
 
-            for p in pair1:
-                if p[0] > -1:
-                    v[p[0]] = 1
 
-                if p[1] > -1:
-                    v[p[1]] = 1
+def find_pairs(conditions, branches, values, branch_values, mode='unique-cause', exact=True):
+    branches_pairs = find_branch_pairs(conditions, branches, values, branch_values, mode)
+    min_pairs, is_minimal = select_pairs([pairs for _, branch_test_pairs in branches_pairs for pairs in branch_test_pairs], exact)
+    print_pairs(conditions, branches_pairs, values, branch_values, min_pairs, is_minimal)
 
-            for p in pair2:
-                if p[0] > -1:
-                    v[p[0]] = 1
+    return min_pairs
 
-                if p[1] > -1:
-                    v[p[1]] = 1
 
-            if sum(v) < min_sum:
-                min_sum = sum(v)
-                min_pairs = pair1 + pair2
+class McdcResult:
+    # Everything computed for a set of branches, with conditions as text so results can be cached and sent between
+    # processes: the truth table (feasible rows and branch values), for every branch the indexes of its conditions and
+    # their candidate independence pairs (row indexes, [[-1, -1]] if there are none), and the pairs chosen for MC/DC.
+    def __init__(self, branches, parsed, conditions, values, branch_values, branches_pairs, min_pairs, is_minimal, mode):
+        self.branches = branches
+        self.parsed = parsed
+        self.conditions = conditions
+        self.values = values
+        self.branch_values = branch_values
+        self.branches_pairs = branches_pairs
+        self.min_pairs = min_pairs
+        self.is_minimal = is_minimal
+        self.mode = mode
 
-    v = [' ' for _ in range(m)]
+    @property
+    def rows(self):
+        # Indexes of the truth table rows making up the MC/DC test set.
+        return sorted(set().union(*(pair_rows(p) for p in self.min_pairs)))
 
-    for p in min_pairs:
-        if p[0] > -1:
-            v[p[0]] = '*'
+    @property
+    def tests(self):
+        # Condition values of the MC/DC test set, one dict per test.
+        return [dict(zip(self.conditions, self.values[row])) for row in self.rows]
+
+
+def normalize_branch(value):
+    # Branch text rebuilt from its parsed conditions and operators, so equal decisions written differently share a key.
+    branch = value if isinstance(value, Branch) else Branch(value)
+    lexemes = [str(branch.conditions[0])]
+
+    for condition, operator in zip(branch.conditions[1:], branch.operators):
+        lexemes += [operator, str(condition)]
 
-        if p[1] > -1:
-            v[p[1]] = '*'
+    return ' '.join(lexemes)
 
-    print('Final table with chosen conditions for MC/DC coverage:')
-    print_table(transpose(values) + transpose(branch_values) + [v], [str(c) for c in conditions] + ['I', 'II', 'MC/DC'])
 
-def build_mcdc(branches):
-    print('Branches:\n\t' + '\n\t'.join([str(b) for b in branches]))
+def analyze(branches, mode='unique-cause', exact=True):
+    branches = [branch if isinstance(branch, Branch) else Branch(branch) for branch in branches]
 
-    conditions = branches[0].conditions + branches[1].conditions
+    conditions = [condition for branch in branches for condition in branch.conditions]
     conditions.sort(key=lambda x: (len(str(x)), str(x)))
-    print('\nParsed:', [str(c) for c in conditions])
+    parsed = [str(c) for c in conditions]
 
     conditions = filter_conditions(conditions)
 
-    print('Filtered:', [str(c) for c in conditions], '\n')
+    values, branch_values = truth_table(conditions, branches)
+    branches_pairs = find_branch_pairs(conditions, branches, values, branch_values, mode)
+    min_pairs, is_minimal = select_pairs([pairs for _, branch_test_pairs in branches_pairs for pairs in branch_test_pairs], exact)
+
+    return McdcResult([str(b) for b in branches], parsed, [str(c) for c in conditions], values, branch_values,
+                      branches_pairs, min_pairs, is_minimal, mode)
+
+
+def _analyze_key(key):
+    branches, mode, exact = key
+    return analyze(list(branches), mode, exact)
+
+
+def analyze_batch(decisions, mode='unique-cause', exact=True, workers=None, cache=None):
+    # Analyzes many sets of branches (lists of branch texts), results are in the order of decisions. Results are cached
+    # by the normalized branch texts, so repeated decisions are analyzed once; pass the same cache dict to later calls
+    # to reuse it. With workers > 1 the decisions not in the cache are analyzed by a process pool.
+    cache = {} if cache is None else cache
+    keys = [(tuple(normalize_branch(branch) for branch in branches), mode, exact) for branches in decisions]
+    missing = [key for key in dict.fromkeys(keys) if key not in cache]
 
-    values, branch_values = make_table(conditions, branches)
-    find_pairs(conditions, branches, values, branch_values)
+    if workers and workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            cache.update(zip(missing, executor.map(_analyze_key, missing, chunksize=max(1, len(missing) // (4 * workers)))))
+    else:
+        cache.update((key, _analyze_key(key)) for key in missing)
+
+    return [cache[key] for key in keys]
+
+
+def print_mcdc(result):
+    print('Branches:\n\t' + '\n\t'.join(result.branches))
+    print('\nParsed:', result.parsed)
+    print('Filtered:', result.conditions, '\n')
+
+    print_truth_table(result.conditions, len(result.branches), result.values, result.branch_values)
+    print_pairs(result.conditions, result.branches_pairs, result.values, result.branch_values, result.min_pairs, result.is_minimal)
+
+
+def build_mcdc(branches, mode='unique-cause', exact=True):
+    result = analyze(branches, mode, exact)
+    print_mcdc(result)
+
+    return result
 
 if __name__ == '__main__':
     branches = [
@@ -295,5 +683,3 @@ if __name__ == '__main__':
     ]
 
     build_mcdc(branches)
-
-